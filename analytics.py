@@ -0,0 +1,229 @@
+# analytics.py
+from extensions import db
+from models import Complaint, ComplaintWeeklyStats, ComplaintResolveHistogram
+from tenancy import current_society
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.exc import IntegrityError
+from collections import Counter, defaultdict
+from datetime import datetime, date, timedelta
+from itertools import accumulate, chain
+import bisect
+
+CLOSED_STATUS = 'Completed'
+# Upper edges of the time-to-resolve histogram buckets; one more bucket holds anything slower
+RESOLVE_BUCKET_HOURS = (1, 2, 4, 8, 12, 24, 36, 48, 72, 96, 120, 168, 240, 336, 504, 720, 1440)
+DEFAULT_WEEKS = 26
+MAX_WEEKS = 520
+
+_UPSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def week_of(moment):
+    """Monday of the week a date or datetime falls in."""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    return day - timedelta(days=day.weekday())
+
+
+def _category(complaint):
+    return complaint.category or 'General'
+
+
+def _bucket(seconds):
+    return bisect.bisect_left(RESOLVE_BUCKET_HOURS, seconds / 3600)
+
+
+def _resolve_seconds(complaint):
+    return max(0, int((complaint.resolved_date - complaint.date_requested).total_seconds()))
+
+
+# ===== INCREMENTAL UPDATES =====
+def _add(model, keys, **deltas):
+    """
+    Add `deltas` to one rollup row, creating it on first use, as a single
+    INSERT ... ON CONFLICT DO UPDATE so concurrent requests never lose counts.
+    Databases without that statement update first and insert when no row
+    matched; if a concurrent request inserted the row in between, the insert
+    fails and the update is retried.
+    """
+    table = model.__table__
+    keys = dict(keys, society_id=current_society())
+    upsert = _UPSERTS.get(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        insert = upsert(table).values(**keys, **deltas)
+        db.session.execute(insert.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + insert.excluded[name] for name in deltas}
+        ))
+        return
+
+    update = table.update().where(*(table.c[name] == value for name, value in keys.items())).values(
+        {name: table.c[name] + delta for name, delta in deltas.items()})
+    if db.session.execute(update).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(**keys, **deltas))
+    except IntegrityError:
+        db.session.execute(update)
+
+
+def _record_resolution(complaint, sign=1):
+    if not (complaint.resolved_date and complaint.date_requested):
+        return
+    seconds = _resolve_seconds(complaint)
+    keys = {'week': week_of(complaint.resolved_date), 'category': _category(complaint)}
+    _add(ComplaintWeeklyStats, keys, resolved_count=sign, resolve_seconds_total=sign * seconds)
+    _add(ComplaintResolveHistogram, dict(keys, bucket=_bucket(seconds)), count=sign)
+
+
+def on_created(complaint):
+    """Count a new complaint in the week it was raised. Call before commit."""
+    _add(ComplaintWeeklyStats,
+         {'week': week_of(complaint.date_requested or datetime.now()), 'category': _category(complaint)},
+         created_count=1)
+
+
+def on_status_change(complaint, old_status):
+    """
+    Count a resolution in the week it happened, or take it back out when a
+    complaint is reopened. Call before commit and before
+    dispatch.on_status_change, which clears resolved_date on reopening.
+    """
+    was_closed = old_status == CLOSED_STATUS
+    is_closed = complaint.status == CLOSED_STATUS
+    if was_closed != is_closed:
+        _record_resolution(complaint, sign=1 if is_closed else -1)
+
+
+def on_deleted(complaint):
+    """Deleting an open complaint takes it off the backlog; resolved ones stay in the history."""
+    if complaint.status != CLOSED_STATUS:
+        _add(ComplaintWeeklyStats, {'week': week_of(datetime.now()), 'category': _category(complaint)},
+             withdrawn_count=1)
+
+
+# ===== READS =====
+def _percentile(counts, p):
+    """Estimate from histogram bucket counts, interpolating linearly within the bucket."""
+    total = sum(counts.values())
+    if total <= 0:
+        return None
+    rank = p * total
+    seen = 0
+    for bucket in sorted(counts):
+        if counts[bucket] <= 0:
+            continue
+        lower = RESOLVE_BUCKET_HOURS[bucket - 1] if bucket else 0
+        if seen + counts[bucket] >= rank:
+            if bucket >= len(RESOLVE_BUCKET_HOURS):
+                return float(lower)
+            upper = RESOLVE_BUCKET_HOURS[bucket]
+            return lower + (upper - lower) * (rank - seen) / counts[bucket]
+        seen += counts[bucket]
+    return float(RESOLVE_BUCKET_HOURS[-1])
+
+
+def _hours(value):
+    return round(value, 2) if value is not None else None
+
+
+def complaint_trends(weeks=DEFAULT_WEEKS, category=None, today=None):
+    """
+    Chart-ready weekly series for the last `weeks` weeks, read only from the
+    rollup tables: complaints raised per category, resolutions with their
+    mean and p90 time-to-resolve (hours, p90 estimated from the histogram),
+    and the open backlog at the end of each week.
+    """
+    end = week_of(today or date.today())
+    start = end - timedelta(weeks=weeks - 1)
+    axis = [start + timedelta(weeks=i) for i in range(weeks)]
+    index = {week: i for i, week in enumerate(axis)}
+
+    stats = ComplaintWeeklyStats.query.filter(ComplaintWeeklyStats.week.between(start, end))
+    histogram = db.session.query(
+        ComplaintResolveHistogram.week, ComplaintResolveHistogram.bucket, db.func.sum(ComplaintResolveHistogram.count)
+    ).filter(ComplaintResolveHistogram.week.between(start, end))
+    opening = db.session.query(db.func.coalesce(db.func.sum(
+        ComplaintWeeklyStats.created_count - ComplaintWeeklyStats.resolved_count - ComplaintWeeklyStats.withdrawn_count
+    ), 0)).filter(ComplaintWeeklyStats.week < start)
+    if category:
+        stats = stats.filter(ComplaintWeeklyStats.category == category)
+        histogram = histogram.filter(ComplaintResolveHistogram.category == category)
+        opening = opening.filter(ComplaintWeeklyStats.category == category)
+
+    created = defaultdict(lambda: [0] * weeks)
+    resolved, seconds, net = [0] * weeks, [0] * weeks, [0] * weeks
+    for row in stats:
+        i = index[row.week]
+        created[row.category][i] += row.created_count
+        resolved[i] += row.resolved_count
+        seconds[i] += row.resolve_seconds_total
+        net[i] += row.created_count - row.resolved_count - row.withdrawn_count
+
+    weekly_buckets = [Counter() for _ in axis]
+    for week, bucket, count in histogram.group_by(ComplaintResolveHistogram.week, ComplaintResolveHistogram.bucket):
+        weekly_buckets[index[week]][bucket] += count
+    overall = sum(weekly_buckets, Counter())
+
+    backlog = list(accumulate(net, initial=opening.scalar()))[1:]
+    total_resolved = sum(resolved)
+    return {
+        'weeks': [week.isoformat() for week in axis],
+        'categories': sorted(created),
+        'created': {name: created[name] for name in sorted(created)},
+        'resolved': resolved,
+        'mean_hours': [_hours(seconds[i] / resolved[i] / 3600) if resolved[i] > 0 else None for i in range(weeks)],
+        'p90_hours': [_hours(_percentile(buckets, 0.9)) for buckets in weekly_buckets],
+        'backlog': backlog,
+        'summary': {
+            'created': sum(sum(series) for series in created.values()),
+            'resolved': total_resolved,
+            'mean_hours': _hours(sum(seconds) / total_resolved / 3600) if total_resolved > 0 else None,
+            'p90_hours': _hours(_percentile(overall, 0.9)),
+            'open': backlog[-1],
+        },
+    }
+
+
+# ===== REBUILD =====
+def rebuild():
+    """
+    Recompute the rollups for the current society from the complaint table
+    and archived complaints. Used to backfill existing data or repair drift;
+    complaints deleted in the past are gone, so they drop out of the history.
+    """
+    import archive
+
+    ComplaintWeeklyStats.query.delete(synchronize_session=False)
+    ComplaintResolveHistogram.query.delete(synchronize_session=False)
+
+    weekly = defaultdict(Counter)
+    buckets = Counter()
+    count = 0
+    for complaint in chain(Complaint.query.yield_per(500), archive.history('complaint')):
+        count += 1
+        category = _category(complaint)
+        if complaint.date_requested:
+            weekly[week_of(complaint.date_requested), category]['created_count'] += 1
+        if complaint.status == CLOSED_STATUS and complaint.resolved_date and complaint.date_requested:
+            seconds = _resolve_seconds(complaint)
+            week = week_of(complaint.resolved_date)
+            weekly[week, category]['resolved_count'] += 1
+            weekly[week, category]['resolve_seconds_total'] += seconds
+            buckets[week, category, _bucket(seconds)] += 1
+
+    society = current_society()
+    if weekly:
+        db.session.execute(ComplaintWeeklyStats.__table__.insert(), [
+            {'society_id': society, 'week': week, 'category': category, 'created_count': counts['created_count'],
+             'resolved_count': counts['resolved_count'], 'resolve_seconds_total': counts['resolve_seconds_total'],
+             'withdrawn_count': 0}
+            for (week, category), counts in weekly.items()
+        ])
+    if buckets:
+        db.session.execute(ComplaintResolveHistogram.__table__.insert(), [
+            {'society_id': society, 'week': week, 'category': category, 'bucket': bucket, 'count': n}
+            for (week, category, bucket), n in buckets.items()
+        ])
+    db.session.commit()
+    return count
@@ -0,0 +1,160 @@
+# archive.py
+from extensions import db
+from models import ArchiveBatch, ArchiveBatchMember, MaintenanceBill, Complaint, Member
+from tenancy import society_context, known_societies
+from datetime import date, datetime
+from types import SimpleNamespace
+import logging
+import json
+import zlib
+
+logger = logging.getLogger(__name__)
+
+KINDS = {'bill': MaintenanceBill, 'complaint': Complaint}
+
+
+class ArchivedRow(SimpleNamespace):
+    """Read-only stand-in for an archived bill or complaint; templates check `.archived`."""
+    archived = True
+
+
+# ===== SELECTION =====
+def _cutoff(months, today=None):
+    """First day of the month `months` before today; anything earlier is cold."""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _eligible(kind, cutoff):
+    if kind == 'bill':
+        return (MaintenanceBill.status == 'Paid',
+                MaintenanceBill.year * 12 + MaintenanceBill.month < cutoff.year * 12 + cutoff.month)
+    return (Complaint.status == 'Completed',
+            Complaint.resolved_date < datetime.combine(cutoff, datetime.min.time()))
+
+
+def _ordering(kind):
+    if kind == 'bill':
+        return (MaintenanceBill.year, MaintenanceBill.month, MaintenanceBill.id)
+    return (Complaint.resolved_date, Complaint.id)
+
+
+def _period(kind, row):
+    if kind == 'bill':
+        return f'{row.year:04d}-{row.month:02d}'
+    return row.resolved_date.strftime('%Y-%m')
+
+
+# ===== ENCODING =====
+def _plain(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _encode(model, rows):
+    names = [c.name for c in model.__table__.columns]
+    doc = {'columns': names, 'rows': [[_plain(getattr(row, name)) for name in names] for row in rows]}
+    return zlib.compress(json.dumps(doc, separators=(',', ':')).encode(), 9)
+
+
+def _decode(model, payload):
+    types = {c.name: c.type for c in model.__table__.columns}
+    doc = json.loads(zlib.decompress(payload))
+    for values in doc['rows']:
+        row = dict.fromkeys(types)  # columns added after archiving read as None
+        for name, value in zip(doc['columns'], values):
+            if name not in types:
+                continue
+            if value is not None and isinstance(types[name], db.DateTime):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(types[name], db.Date):
+                value = date.fromisoformat(value)
+            row[name] = value
+        yield row
+
+
+# ===== MOVING ROWS =====
+def count_eligible(kind, months):
+    model = KINDS[kind]
+    return model.query.filter(*_eligible(kind, _cutoff(months))).count()
+
+
+def archive_kind(kind, months, batch_size=500):
+    """
+    Move cold rows of one kind into compressed batches for the current society.
+    Each batch is written and its rows deleted in one transaction; a row whose
+    version changed since it was read aborts the batch instead of archiving a
+    stale copy. Returns the number of rows moved.
+    """
+    model = KINDS[kind]
+    eligible = _eligible(kind, _cutoff(months))
+    moved = 0
+    while True:
+        rows = model.query.filter(*eligible).order_by(*_ordering(kind)).limit(batch_size).all()
+        if not rows:
+            return moved
+
+        periods = {}
+        for row in rows:
+            periods.setdefault(_period(kind, row), []).append(row)
+        for period, group in periods.items():
+            db.session.add(ArchiveBatch(
+                kind=kind, period=period, row_count=len(group),
+                amount_total=sum(row.total_amount for row in group) if kind == 'bill' else 0.0,
+                payload=_encode(model, group),
+                members=[ArchiveBatchMember(member_id=m) for m in sorted({row.member_id for row in group})],
+            ))
+
+        keys = [(row.id, row.version) for row in rows]
+        deleted = model.query.filter(db.tuple_(model.id, model.version).in_(keys)).delete(
+            synchronize_session=False)
+        if deleted != len(rows):
+            db.session.rollback()
+            logger.warning('Archiving %s rows raced with an update; will retry on the next run', kind)
+            return moved
+
+        db.session.commit()
+        db.session.expunge_all()
+        moved += len(rows)
+
+
+def archive_all(app, months, batch_size=500, dry_run=False):
+    """Archive bills and complaints for every configured society. Returns {society: {kind: count}}."""
+    totals = {}
+    for society in sorted(known_societies(app)):
+        with society_context(society):
+            if dry_run:
+                totals[society] = {kind: count_eligible(kind, months) for kind in KINDS}
+            else:
+                totals[society] = {kind: archive_kind(kind, months, batch_size) for kind in KINDS}
+    return totals
+
+
+# ===== READS =====
+def totals(kind):
+    """(row count, amount) held in the archive; answered from batch headers only."""
+    count, amount = db.session.query(
+        db.func.coalesce(db.func.sum(ArchiveBatch.row_count), 0),
+        db.func.coalesce(db.func.sum(ArchiveBatch.amount_total), 0.0),
+    ).filter(ArchiveBatch.kind == kind).one()
+    return count, amount
+
+
+def history(kind, member_id=None):
+    """Archived rows for explicit history views, newest period first, optionally for one member."""
+    model = KINDS[kind]
+    batches = ArchiveBatch.query.filter_by(kind=kind)
+    if member_id is not None:
+        # Batches archived before members were recorded have none and are searched in full
+        batches = batches.filter(db.or_(ArchiveBatch.members.any(ArchiveBatchMember.member_id == member_id),
+                                        ~ArchiveBatch.members.any()))
+
+    rows = []
+    for batch in batches.order_by(ArchiveBatch.period.desc(), ArchiveBatch.id):
+        for row in _decode(model, batch.payload):
+            if member_id is None or row['member_id'] == member_id:
+                rows.append(row)
+
+    member_ids = {row['member_id'] for row in rows}
+    members = {m.id: m for m in Member.query.filter(Member.id.in_(member_ids))} if member_ids else {}
+    return [ArchivedRow(member=members.get(row['member_id']), **row) for row in rows]
@@ -0,0 +1,176 @@
+# assets.py
+from flask import request, send_from_directory, current_app
+from werkzeug.exceptions import NotFound
+import mimetypes
+import hashlib
+import logging
+import shutil
+import json
+import gzip
+import zlib
+import os
+
+try:
+    import brotli
+except ImportError:  # optional: .br files are only built when the package is installed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+# ===== BUILD =====
+def build(static_dir, out_dir, min_size=512):
+    """
+    Copy every static file to <out_dir>/<name>.<hash><ext>, write .gz (and .br
+    when brotli is available) next to the compressible ones, and record the
+    logical -> fingerprinted mapping in manifest.json. Run once per deploy.
+    Returns the manifest.
+    """
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+    out_name = os.path.relpath(out_dir, static_dir)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        rel_root = os.path.relpath(root, static_dir)
+        if rel_root.split(os.sep)[0] == out_name:
+            dirs[:] = []
+            continue
+        for name in sorted(files):
+            logical = os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, '/')
+            with open(os.path.join(root, name), 'rb') as f:
+                data = f.read()
+            stem, ext = os.path.splitext(logical)
+            built = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+            target = os.path.join(out_dir, built)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            if ext in COMPRESSIBLE and len(data) >= min_size:
+                with open(target + '.gz', 'wb') as f:
+                    f.write(gzip.compress(data, 9, mtime=0))
+                if brotli is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(brotli.compress(data, quality=11))
+            manifest[logical] = f'{out_name}/{built}'
+
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+# ===== SERVING =====
+def _accepts(encoding):
+    # Parsed with q-values: 'gzip;q=0' refuses gzip, '*' accepts anything not listed
+    return request.accept_encodings[encoding] > 0
+
+
+def serve_static(filename):
+    """
+    Replacement for Flask's static view. Fingerprinted build output is served
+    with a year-long immutable Cache-Control and the best precompressed copy
+    the client accepts; everything else falls back to Flask's own handling.
+    """
+    app = current_app
+    if not filename.startswith(_prefix(app)):
+        return app.send_static_file(filename)
+
+    directory = app.static_folder
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if _accepts(encoding) and os.path.isfile(os.path.join(directory, filename + suffix)):
+            response = send_from_directory(directory, filename + suffix, max_age=31536000,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        try:
+            response = send_from_directory(directory, filename, max_age=31536000)
+        except NotFound:
+            # Stale page from before a deploy: the unhashed file is the best we have
+            logical = _logical(filename)
+            if logical is None:
+                raise
+            return app.send_static_file(logical)
+
+    response.headers['Cache-Control'] = IMMUTABLE
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _prefix(app):
+    """URL prefix of the build output under /static, e.g. 'dist/'."""
+    return os.path.relpath(app.config['ASSETS_DIR'], app.static_folder).replace(os.sep, '/') + '/'
+
+
+def _logical(filename):
+    """'dist/css/base.0123456789ab.css' -> 'css/base.css'"""
+    stem, ext = os.path.splitext(filename[len(_prefix(current_app)):])
+    stem, _, digest = stem.rpartition('.')
+    return stem + ext if len(digest) == 12 else None
+
+
+# ===== HTML COMPRESSION =====
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        # Flush per chunk so streamed pages keep their early first byte
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response):
+    app = current_app
+    if (response.mimetype != 'text/html'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or not _accepts('gzip')):
+        return response
+
+    level = app.config['COMPRESS_LEVEL']
+    if response.is_streamed:
+        response.response = _gzip_stream(response.iter_encoded(), level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(gzip.compress(data, level))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('ASSETS_DIR', os.path.join(app.static_folder, 'dist'))
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+
+    manifest = load_manifest(app.config['ASSETS_DIR'])
+    if not manifest:
+        logger.debug('No asset manifest; static files are served unfingerprinted')
+    app.extensions['asset_manifest'] = manifest
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    app.view_functions['static'] = serve_static
+    app.after_request(compress_response)
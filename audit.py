@@ -0,0 +1,243 @@
+# audit.py
+from flask import current_app, has_request_context
+from flask_login import current_user
+from sqlalchemy import event, DDL
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db, limiter
+from models import AuditEvent
+from tenancy import SocietySession, current_society
+from datetime import datetime, timedelta
+import threading
+import logging
+import atexit
+import queue
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'audit_pending'
+_STOP = object()
+
+# Append-only in the database itself, not just by convention in the app
+for _op in ('UPDATE', 'DELETE'):
+    event.listen(AuditEvent.__table__, 'after_create', DDL(
+        f"CREATE TRIGGER audit_event_no_{_op.lower()} BEFORE {_op} ON audit_event "
+        f"BEGIN SELECT RAISE(ABORT, 'audit_event is append-only'); END"
+    ).execute_if(dialect='sqlite'))
+
+
+# ===== RECORDING =====
+def record(action, entity, entity_id=None, summary=None, **details):
+    """
+    Stage an audit event on the current transaction. It is handed to the
+    background writer when the transaction commits and dropped if it rolls
+    back, so a retried or failed action leaves no stray entries.
+    """
+    actor_id = actor = ip = None
+    if has_request_context():
+        if current_user.is_authenticated:
+            actor_id, actor = current_user.id, current_user.username
+        ip = limiter.client_ip()
+    row = {
+        'society_id': current_society(),
+        'created_at': datetime.now(),
+        'actor_id': actor_id,
+        'actor': actor or 'system',
+        'action': action,
+        'entity': entity,
+        'entity_id': entity_id,
+        'summary': summary[:255] if summary else None,
+        'details': json.dumps(details, default=str, sort_keys=True) if details else None,
+        'ip': ip,
+    }
+    db.session.info.setdefault(PENDING_KEY, []).append(row)
+    return row
+
+
+def _after_commit(session):
+    rows = session.info.pop(PENDING_KEY, None)
+    if rows:
+        current_app.extensions['audit'].submit(rows)
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+
+
+# ===== WRITER =====
+class AuditWriter:
+    """
+    Writes audit events from a bounded in-memory queue on one background
+    thread, as one multi-row INSERT per batch, so admin actions never wait on
+    an extra SQLite write. A batch is whatever arrives within flush_interval
+    of its first event, up to batch_size.
+
+    When the queue is full the committing request writes its own events
+    instead: slower, but nothing is dropped. close() (also run at exit)
+    writes out everything still queued.
+    """
+
+    def __init__(self, app, max_queue=10000, batch_size=200, flush_interval=0.2, retries=3):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {'written': 0, 'batches': 0, 'overflow': 0, 'failed': 0}
+
+    def submit(self, rows):
+        if self._closed:
+            self._write(rows)
+            return
+        self._ensure_started()
+        for row in rows:
+            try:
+                self.queue.put_nowait(row)
+            except queue.Full:
+                self._count('overflow')
+                self._write([row])
+
+    def _ensure_started(self):
+        # Started lazily, so a worker forked from a preloaded app gets its own thread
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            batch, taken = [], 1
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self.queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception:
+                logger.exception('Audit writer failed on a batch of %d events', len(batch))
+            finally:
+                for _ in range(taken):
+                    self.queue.task_done()
+
+    def _write(self, rows):
+        by_society = {}
+        for row in rows:
+            by_society.setdefault(row['society_id'], []).append(row)
+
+        with self.app.app_context():
+            pool = self.app.extensions.get('society_engines')
+            for society, batch in by_society.items():
+                engine = pool.get(society) if pool is not None else db.engine
+                for attempt in range(1, self.retries + 1):
+                    try:
+                        with engine.begin() as conn:
+                            conn.execute(AuditEvent.__table__.insert(), batch)
+                    except SQLAlchemyError:
+                        if attempt < self.retries:
+                            time.sleep(0.05 * 2 ** attempt)
+                            continue
+                        # Last resort: the events survive in the log even if the database is unavailable
+                        self._count('failed', len(batch))
+                        logger.exception('Could not write %d audit events: %s',
+                                         len(batch), json.dumps(batch, default=str))
+                    else:
+                        self._count('written', len(batch))
+                        self._count('batches')
+                    break
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, queued=self.queue.qsize())
+
+    def flush(self):
+        """Block until every event queued so far has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+
+    def close(self, timeout=10):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+def init_app(app):
+    app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+    app.config.setdefault('AUDIT_BATCH_SIZE', 200)
+    app.config.setdefault('AUDIT_FLUSH_INTERVAL', 0.2)
+    app.config.setdefault('AUDIT_PAGE_SIZE', 100)
+
+    writer = AuditWriter(app,
+                         max_queue=app.config['AUDIT_QUEUE_SIZE'],
+                         batch_size=app.config['AUDIT_BATCH_SIZE'],
+                         flush_interval=app.config['AUDIT_FLUSH_INTERVAL'])
+    app.extensions['audit'] = writer
+    atexit.register(writer.close)
+
+    if not event.contains(SocietySession, 'after_commit', _after_commit):
+        event.listen(SocietySession, 'after_commit', _after_commit)
+        event.listen(SocietySession, 'after_soft_rollback', _after_rollback)
+
+
+# ===== QUERYING =====
+def search(action=None, entity=None, entity_id=None, actor=None, since=None, until=None,
+           before=None, limit=100):
+    """
+    Newest events first, optionally filtered; every filter combination is
+    served by one of the audit_event indexes. `before` is the id of the last
+    event on the previous page. Returns (events, has_more).
+    """
+    query = AuditEvent.query
+    if action:
+        query = query.filter(AuditEvent.action == action)
+    if entity:
+        query = query.filter(AuditEvent.entity == entity)
+        if entity_id is not None:
+            query = query.filter(AuditEvent.entity_id == entity_id)
+    if actor:
+        query = query.filter(AuditEvent.actor == actor)
+    if since:
+        query = query.filter(AuditEvent.created_at >= since)
+    if until:
+        query = query.filter(AuditEvent.created_at < until + timedelta(days=1))
+    if before:
+        cursor = db.session.get(AuditEvent, before)
+        if cursor is not None:
+            query = query.filter(db.tuple_(AuditEvent.created_at, AuditEvent.id)
+                                 < db.tuple_(cursor.created_at, cursor.id))
+
+    events = query.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc()).limit(limit + 1).all()
+    return events[:limit], len(events) > limit
+
+
+def actions():
+    return [row[0] for row in db.session.query(AuditEvent.action).distinct().order_by(AuditEvent.action)]
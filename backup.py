@@ -0,0 +1,187 @@
+# backup.py
+from sqlalchemy.engine import make_url
+from datetime import datetime
+import contextlib
+import logging
+import tempfile
+import shutil
+import sqlite3
+import time
+import gzip
+import re
+import glob
+import os
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.db.gz'
+# '-20260101-120000-123456'; names from before microseconds were added lack the last part
+STAMP = r'-\d{8}-\d{6}(?:-\d{6})?'
+
+
+class BackupRestarted(Exception):
+    """Writers kept modifying the source, so the page-by-page copy kept starting over."""
+
+
+# ===== WHAT TO BACK UP =====
+def database_files(app):
+    """{name: path} of every SQLite file holding society data."""
+    if app.config.get('SOCIETY_STORAGE') == 'per_tenant':
+        pattern = os.path.join(app.config['SOCIETY_DB_DIR'], '*.db')
+        return {os.path.basename(path)[:-3]: path for path in sorted(glob.glob(pattern))}
+
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or not url.database:
+        raise ValueError('Online backup only supports file-based SQLite databases')
+    return {'society': url.database}
+
+
+# ===== COPYING =====
+def _copy(source_path, target_path, pages, pause, max_restarts):
+    """
+    Online copy with sqlite3's backup API, `pages` pages per step, sleeping
+    `pause` seconds between steps so writers get the lock in between. Any
+    write from another connection makes SQLite restart the copy; after
+    max_restarts of those the attempt is abandoned.
+    """
+    state = {'remaining': None, 'restarts': 0}
+
+    def progress(status, remaining, total):
+        # A successful step that made no headway means the copy started over
+        if status == sqlite3.SQLITE_OK and state['remaining'] is not None and remaining >= state['remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > max_restarts:
+                raise BackupRestarted()
+        state['remaining'] = remaining
+        if pause and remaining:
+            time.sleep(pause)
+
+    source = sqlite3.connect(source_path, timeout=30)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages, progress=progress)
+    finally:
+        target.close()
+        source.close()
+    return state['restarts']
+
+
+def online_copy(source_path, target_path, pages=1024, pause=0.005, max_restarts=3):
+    """
+    Copy a live database without stalling writers. Under heavy write load the
+    step size grows each time the copy keeps restarting, ending with a single
+    step that cannot be interrupted. Returns the step size that finished.
+    """
+    while True:
+        try:
+            _copy(source_path, target_path, pages, pause, max_restarts)
+            return pages
+        except BackupRestarted:
+            if pages < 0:
+                raise
+            pages = pages * 8 if pages < 65536 else -1
+            logger.info('Backup of %s kept restarting; retrying with %s pages per step',
+                        source_path, 'all' if pages < 0 else pages)
+
+
+def snapshot(name, source_path, backup_dir, pages=1024, pause=0.005):
+    """Take one compressed snapshot; returns (path, seconds, bytes)."""
+    os.makedirs(backup_dir, exist_ok=True)
+    start = time.perf_counter()
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    path = os.path.join(backup_dir, f'{name}-{stamp}{SUFFIX}')
+
+    fd, raw = tempfile.mkstemp(dir=backup_dir, suffix='.db')
+    os.close(fd)
+    try:
+        online_copy(source_path, raw, pages=pages, pause=pause)
+        with open(raw, 'rb') as src, gzip.open(path + '.tmp', 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(path + '.tmp', path)
+    finally:
+        os.remove(raw)
+    return path, time.perf_counter() - start, os.path.getsize(path)
+
+
+def list_snapshots(backup_dir, name):
+    """Snapshots of exactly this database, oldest first; 'green' never matches 'green-park-...'."""
+    pattern = re.compile(re.escape(name) + STAMP + re.escape(SUFFIX) + '$')
+    return sorted(os.path.join(backup_dir, entry) for entry in os.listdir(backup_dir) if pattern.match(entry))
+
+
+def prune(backup_dir, name, keep):
+    """Delete all but the newest `keep` snapshots of one database. Returns the removed paths."""
+    snapshots = list_snapshots(backup_dir, name)
+    removed = snapshots[:-keep] if keep > 0 else []
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def run(app):
+    """Snapshot every database and apply retention. Returns [(path, seconds, bytes)]."""
+    backup_dir = app.config['BACKUP_DIR']
+    results = []
+    for name, source in database_files(app).items():
+        result = snapshot(name, source, backup_dir,
+                          pages=app.config['BACKUP_PAGES_PER_STEP'],
+                          pause=app.config['BACKUP_STEP_PAUSE'])
+        prune(backup_dir, name, app.config['BACKUP_KEEP'])
+        results.append(result)
+    return results
+
+
+# ===== VERIFY / RESTORE =====
+@contextlib.contextmanager
+def _expanded(path):
+    fd, raw = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        with gzip.open(path, 'rb') as src, open(raw, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        yield raw
+    finally:
+        os.remove(raw)
+
+
+def _check(raw):
+    conn = sqlite3.connect(raw)
+    try:
+        result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        counts = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+    return result == 'ok', result, counts
+
+
+def verify(path):
+    """Integrity-check a snapshot. Returns (ok, message, {table: row count})."""
+    with _expanded(path) as raw:
+        return _check(raw)
+
+
+def restore(path, target_path):
+    """
+    Verify a snapshot, then copy it over the live database through the backup
+    API, which takes the target's write lock instead of replacing the file
+    under open connections.
+    """
+    with _expanded(path) as raw:
+        ok, message, counts = _check(raw)
+        if not ok:
+            raise ValueError(f'Snapshot failed integrity check: {message}')
+        source = sqlite3.connect(raw)
+        target = sqlite3.connect(target_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    return counts
+
+
+def snapshot_name(path):
+    """Database name a snapshot file belongs to ('society-20260101-120000-000000.db.gz' -> 'society')."""
+    return re.sub(STAMP + '$', '', os.path.basename(path)[:-len(SUFFIX)])
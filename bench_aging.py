@@ -0,0 +1,51 @@
+# bench_aging.py
+# Seeds a throwaway SQLite database with outstanding bills and times compute_aging().
+# Usage: python bench_aging.py [bill_count]
+import os
+import sys
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from flask import Flask
+from extensions import db
+from receivables import compute_aging
+import sample_data
+
+
+def seed(bill_count, member_count=2000):
+    today = date.today()
+    statuses = ['Paid', 'Unpaid', 'Overdue']
+    sample_data.add_members(member_count)
+    sample_data.add_bills(bill_count, member_count, month=1, year=2000,
+                          due_date=lambda i: today - timedelta(days=random.randint(-10, 400)),
+                          status=lambda i: random.choice(statuses))
+
+
+def main():
+    bill_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        seed(bill_count)
+        print(f"Seeded {bill_count} bills in {time.perf_counter() - start:.1f}s")
+
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            aging = compute_aging(top_k=10)
+            timings.append(time.perf_counter() - start)
+
+        print(f"Outstanding bills: {aging['bill_count']} across {aging['member_count']} members")
+        print(f"compute_aging: best {min(timings) * 1000:.0f} ms, worst {max(timings) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# bench_analytics.py
+# Response time of the complaint analytics endpoint served from the weekly rollups, against
+# computing the same series from the raw complaint table, as history grows.
+# Usage: python bench_analytics.py [complaints_per_year] [years]
+import os
+import sys
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+import analytics
+from main import create_app, seed
+from extensions import db
+from models import Complaint
+import sample_data
+
+CATEGORIES = ('Plumbing', 'Electrical', 'Cleaning', 'Other')
+
+
+def populate(count, years_back):
+    """`count` complaints raised during the year that ended `years_back` years ago."""
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        requested = now - timedelta(days=365 * years_back, minutes=random.randrange(525600))
+        resolved = requested + timedelta(hours=random.expovariate(1 / 48))
+        done = resolved < now and random.random() < 0.95
+        rows.append({'member_id': 1, 'description': f'Complaint {i}', 'category': random.choice(CATEGORIES),
+                     'priority': 'Medium', 'status': 'Completed' if done else 'Pending',
+                     'date_requested': requested, 'resolved_date': resolved if done else None})
+    db.session.execute(Complaint.__table__.insert(), rows)
+    db.session.commit()
+
+
+def from_raw(weeks):
+    """The same series computed straight from the complaint table."""
+    end = analytics.week_of(datetime.now())
+    start = end - timedelta(weeks=weeks - 1)
+    created, resolved, durations, net = {}, [0] * weeks, [[] for _ in range(weeks)], [0] * weeks
+    opening = 0
+    rows = db.session.query(Complaint.date_requested, Complaint.resolved_date, Complaint.category, Complaint.status)
+    for requested, resolved_date, category, status in rows:
+        i = (analytics.week_of(requested) - start).days // 7
+        if i < 0:
+            opening += 1
+        else:
+            created.setdefault(category, [0] * weeks)[i] += 1
+            net[i] += 1
+        if status == 'Completed' and resolved_date:
+            j = (analytics.week_of(resolved_date) - start).days // 7
+            if j < 0:
+                opening -= 1
+            else:
+                resolved[j] += 1
+                net[j] -= 1
+                durations[j].append((resolved_date - requested).total_seconds() / 3600)
+    p90 = [sorted(d)[int(len(d) * 0.9)] if d else None for d in durations]
+    return created, resolved, p90, net, opening
+
+
+def timed(fn, runs=5):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[runs // 2] * 1000
+
+
+def main():
+    per_year = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    app = create_app('production')
+    app.config['RATELIMIT_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+        sample_data.add_members(1)
+    app.test_cli_runner().invoke(seed)
+
+    client = app.test_client()
+    sample_data.login(client)
+
+    print("last 52 weeks, with history growing a year at a time")
+    print(f"{'complaints':>10}{'rollup rows':>13}{'trends ms':>11}{'endpoint ms':>13}{'raw ms':>10}")
+    for year in range(years):
+        with app.app_context():
+            populate(per_year, year)
+            analytics.rebuild()
+            total = db.session.query(Complaint).count()
+            rollups = db.session.query(analytics.ComplaintWeeklyStats).count()
+            trends = timed(lambda: analytics.complaint_trends(weeks=52))
+            raw = timed(lambda: from_raw(52), runs=3)
+        endpoint = timed(lambda: client.get('/admin/complaints/analytics.json?weeks=52'))
+        print(f"{total:>10}{rollups:>13}{trends:>11.1f}{endpoint:>13.1f}{raw:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# bench_assets.py
+# Page weight and time-to-first-byte of the admin billing page with and without response
+# compression, plus how static assets are served once 'flask assets-build' has run.
+# Usage: python bench_assets.py [bill_count]
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+import assets
+from main import create_app, seed
+from extensions import db
+import sample_data
+
+
+def populate(bill_count):
+    db.create_all()
+    sample_data.add_members(200)
+    sample_data.add_bills(bill_count, 200, month=lambda i: i % 12 + 1)
+
+
+def fetch(client, path, encoding):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    start = time.perf_counter()
+    response = client.get(path, headers=headers, buffered=False)
+    chunks = iter(response.response)
+    first = next(chunks, b'')
+    ttfb = time.perf_counter() - start
+    size = len(first) + sum(len(chunk) for chunk in chunks)
+    total = time.perf_counter() - start
+    response.close()
+    return response, size, ttfb, total
+
+
+def main():
+    bill_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = create_app('production')
+    app.config['RATELIMIT_ENABLED'] = False
+    with app.app_context():
+        populate(bill_count)
+        assets.build(app.static_folder, app.config['ASSETS_DIR'])
+    app.test_cli_runner().invoke(seed)
+    app = create_app('production')  # picks up the fresh manifest
+
+    client = app.test_client()
+    sample_data.login(client)
+    fetch(client, '/admin/billing', None)  # warm template cache
+
+    print(f"/admin/billing with {bill_count} bills")
+    print(f"{'encoding':<12}{'bytes':>10}{'ttfb ms':>10}{'total ms':>10}")
+    for encoding in (None, 'gzip'):
+        runs = [fetch(client, '/admin/billing', encoding) for _ in range(5)]
+        _, size, _, _ = runs[-1]
+        ttfb = sorted(r[2] for r in runs)[2] * 1000
+        total = sorted(r[3] for r in runs)[2] * 1000
+        print(f"{encoding or 'identity':<12}{size:>10}{ttfb:>10.1f}{total:>10.1f}")
+
+    print()
+    print(f"{'asset':<40}{'encoding':>9}{'bytes':>8}  cache-control")
+    with app.test_request_context():
+        from flask import url_for
+        urls = [url_for('static', filename=name) for name in ('css/base.css', 'js/base.js')]
+    for url in urls:
+        for encoding in (None, 'br, gzip'):
+            response, size, _, _ = fetch(client, url, encoding)
+            print(f"{url:<40}{response.headers.get('Content-Encoding', 'identity'):>9}{size:>8}  "
+                  f"{response.headers.get('Cache-Control')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# bench_audit.py
+# Latency of an audited admin action (complaint status change) with audit events written by the
+# background batch writer versus inserted synchronously after each commit.
+# Usage: python bench_audit.py [requests]
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from main import create_app, seed
+from extensions import db
+from models import AuditEvent
+import sample_data
+
+STATUSES = ('Pending', 'In Progress', 'Completed')
+
+
+def populate():
+    db.create_all()
+    sample_data.add_members(1)
+    sample_data.add_complaints(50)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def measure(app, client, label, count):
+    latencies = []
+    for i in range(count):
+        # Every pass over the 50 complaints moves each one to the next status, so every request is audited
+        path = f'/admin/complaints/update/{i % 50 + 1}/{STATUSES[(i // 50 + 1) % 3]}'
+        start = time.perf_counter()
+        client.get(path)
+        latencies.append(time.perf_counter() - start)
+    writer = app.extensions['audit']
+    start = time.perf_counter()
+    writer.flush()
+    drain = time.perf_counter() - start
+    print(f"{label:<14}{percentile(latencies, 0.5):>9.2f}{percentile(latencies, 0.99):>9.2f}"
+          f"{sum(latencies):>10.2f}{drain * 1000:>10.1f}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    app = create_app('production')
+    app.config['RATELIMIT_ENABLED'] = False
+    with app.app_context():
+        populate()
+    app.test_cli_runner().invoke(seed)
+
+    client = app.test_client()
+    sample_data.login(client)
+    client.get('/admin/complaints')  # warm up
+
+    print(f"{count} complaint status changes")
+    print(f"{'audit writes':<14}{'p50 ms':>9}{'p99 ms':>9}{'total s':>10}{'drain ms':>10}")
+    writer = app.extensions['audit']
+    measure(app, client, 'batched', count - count % 150)
+    batched = writer.stats()
+
+    writer.submit = writer._write
+    measure(app, client, 'synchronous', count - count % 150)
+    writer.close()
+
+    with app.app_context():
+        rows = db.session.query(AuditEvent).count()
+    print(f"\n{rows} events stored; batched writer used {batched['batches']} INSERTs "
+          f"for {batched['written']} events")
+
+
+if __name__ == '__main__':
+    main()
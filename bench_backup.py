@@ -0,0 +1,91 @@
+# bench_backup.py
+# Measures snapshot duration and the latency of concurrent write transactions while an online
+# backup runs, comparing one-shot copies with the incremental page-step copy in backup.py.
+# Usage: python bench_backup.py [bill_count]
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+
+import backup
+
+
+def seed(path, bill_count):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE bill (id INTEGER PRIMARY KEY, member_id INTEGER, bill_number TEXT, '
+                 'total_amount REAL, status TEXT, remarks TEXT)')
+    conn.executemany('INSERT INTO bill (member_id, bill_number, total_amount, status, remarks) VALUES (?, ?, ?, ?, ?)',
+                     ((i % 500, f'BENCH/{i}', 1800.0, 'Unpaid', 'x' * 120) for i in range(bill_count)))
+    conn.commit()
+    conn.close()
+
+
+class Writer(threading.Thread):
+    """Small write transactions at a steady rate, like request traffic; records their latency."""
+
+    def __init__(self, path, interval=0.005):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.latencies = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        i = 0
+        while not self.stopped.is_set():
+            start = time.perf_counter()
+            conn.execute("UPDATE bill SET status = 'Paid' WHERE id = ?", (i % 1000 + 1,))
+            conn.commit()
+            self.latencies.append((start, time.perf_counter() - start))
+            i += 1
+            time.sleep(self.interval)
+        conn.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+def measure(path, label, copy):
+    writer = Writer(path)
+    writer.start()
+    time.sleep(0.5)
+    start = time.perf_counter()
+    pages = copy() if copy else time.sleep(2)
+    end = time.perf_counter()
+    elapsed = end - start
+    time.sleep(0.2)
+    writer.stopped.set()
+    writer.join()
+    # Writes that started while the copy ran, including any it held up past its end
+    during = [latency for began, latency in writer.latencies if start <= began < end]
+    steps = '' if pages is None else ('all' if pages < 0 else str(pages))
+    print(f"{label:<22}{steps:>7}{elapsed:>9.2f}{len(during):>9}"
+          f"{percentile(during, 0.5):>9.2f}{percentile(during, 0.99):>9.2f}{max(during, default=0) * 1000:>9.1f}")
+
+
+def main():
+    bill_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, 'bench.db')
+    seed(path, bill_count)
+    print(f"{bill_count} bills, {os.path.getsize(path) / 1024 / 1024:.0f} MB database")
+    print(f"{'copy':<22}{'pages':>7}{'secs':>9}{'writes':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+
+    target = os.path.join(workdir, 'copy.db')
+    measure(path, 'no backup (2s)', None)
+    measure(path, 'one step', lambda: backup._copy(path, target, -1, 0, 0) or -1)
+    measure(path, 'incremental', lambda: backup.online_copy(path, target, pages=1024, pause=0.005))
+
+    start = time.perf_counter()
+    snapshot, seconds, size = backup.snapshot('bench', path, workdir)
+    print(f"compressed snapshot: {size / 1024 / 1024:.1f} MB in {seconds:.2f}s "
+          f"(verify: {'ok' if backup.verify(snapshot)[0] else 'FAILED'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+# bench_concurrency.py
+# Stress test for optimistic concurrency on MaintenanceBill: counts lost updates with and
+# without the version check, and races resident payments against the overdue sweep.
+# Usage: python bench_concurrency.py [threads] [updates_per_thread]
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from flask import Flask
+from extensions import db
+from models import Member, MaintenanceBill
+import concurrency
+
+HOT_BILLS = 4
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(bill_count, overdue=False):
+    MaintenanceBill.query.delete()
+    Member.query.delete()
+    db.session.add(Member(id=1, name='Bench', flat_no='101', email='bench@example.com'))
+    due = date.today() - timedelta(days=5 if overdue else -30)
+    db.session.execute(MaintenanceBill.__table__.insert(), [
+        {'member_id': 1, 'bill_number': f'BENCH/{i}', 'month': 1, 'year': 2000,
+         'subtotal': 1800.0, 'total_amount': 1800.0, 'due_date': due, 'status': 'Unpaid'}
+        for i in range(bill_count)
+    ])
+    db.session.commit()
+    return [row.id for row in db.session.query(MaintenanceBill.id).order_by(MaintenanceBill.id)]
+
+
+def run_threads(app, threads, work):
+    errors = []
+
+    def worker(n):
+        with app.app_context():
+            try:
+                work(n)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start, errors
+
+
+def increments(app, threads, per_thread, versioned):
+    """Every thread adds 1.00 to the late fee of a few hot bills, read-modify-write in Python."""
+    with app.app_context():
+        ids = seed(HOT_BILLS)
+
+    def bump(n):
+        for i in range(per_thread):
+            bill_id = ids[(n + i) % len(ids)]
+
+            def apply():
+                bill = db.session.get(MaintenanceBill, bill_id)
+                bill.late_fee = bill.late_fee + 1
+                time.sleep(0)  # widen the read-modify-write window
+
+            if versioned:
+                concurrency.run_with_retry(apply, attempts=50)
+            else:
+                # Same update with the version check disabled, i.e. the old behaviour
+                bill = db.session.get(MaintenanceBill, bill_id)
+                late_fee = bill.late_fee + 1
+                time.sleep(0)
+                MaintenanceBill.query.filter_by(id=bill_id).update(
+                    {MaintenanceBill.late_fee: late_fee}, synchronize_session=False)
+                db.session.commit()
+
+    before = concurrency.stats()
+    elapsed, errors = run_threads(app, threads, bump)
+    after = concurrency.stats()
+    with app.app_context():
+        applied = db.session.query(db.func.sum(MaintenanceBill.late_fee)).scalar()
+    expected = threads * per_thread
+    return {
+        'elapsed': elapsed,
+        'rate': expected / elapsed,
+        'lost': int(expected - applied) - (after['gave_up'] - before['gave_up']),
+        'conflicts': after['conflicts'] - before['conflicts'],
+        'gave_up': after['gave_up'] - before['gave_up'],
+        'errors': len(errors),
+    }
+
+
+def pay_vs_sweep(app, bill_count, payers):
+    """Residents pay overdue-eligible bills while the sweep runs; nobody paid may end up Overdue."""
+    with app.app_context():
+        ids = seed(bill_count, overdue=True)
+
+    def work(n):
+        if n == 0:
+            for _ in range(5):
+                def sweep():
+                    bills = MaintenanceBill.query.filter(
+                        MaintenanceBill.status == 'Unpaid',
+                        MaintenanceBill.due_date < date.today()).all()
+                    for bill in bills:
+                        bill.status = 'Overdue'
+                        if bill.late_fee == 0:
+                            bill.late_fee = 100.00
+                            bill.calculate_totals()
+                concurrency.run_with_retry(sweep, attempts=20)
+            return
+        for bill_id in ids[n - 1::payers]:
+            def pay():
+                bill = db.session.get(MaintenanceBill, bill_id)
+                if bill.status != 'Paid':
+                    bill.status = 'Paid'
+                    bill.paid_date = date.today()
+            concurrency.run_with_retry(pay, attempts=20)
+
+    elapsed, errors = run_threads(app, payers + 1, work)
+    with app.app_context():
+        lost = MaintenanceBill.query.filter(
+            MaintenanceBill.paid_date.isnot(None), MaintenanceBill.status != 'Paid').count()
+    return elapsed, lost, len(errors)
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    app = make_app()
+
+    print(f"{threads} threads x {per_thread} updates on {HOT_BILLS} hot bills")
+    print(f"{'mode':<12}{'updates/s':>10}{'lost':>8}{'conflicts':>11}{'gave up':>9}{'errors':>8}")
+    for label, versioned in (('unversioned', False), ('versioned', True)):
+        r = increments(app, threads, per_thread, versioned)
+        print(f"{label:<12}{r['rate']:>10.0f}{r['lost']:>8}{r['conflicts']:>11}{r['gave_up']:>9}{r['errors']:>8}")
+
+    elapsed, lost, errors = pay_vs_sweep(app, 2000, threads)
+    print(f"pay vs overdue sweep: 2000 bills in {elapsed:.2f}s, "
+          f"{lost} paid bills overwritten, {errors} errors")
+
+
+if __name__ == '__main__':
+    main()
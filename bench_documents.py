@@ -0,0 +1,77 @@
+# bench_documents.py
+# Measures PDF bill rendering throughput (bills/sec, and per core) for the document pipeline.
+# Usage: python bench_documents.py [bill_count]
+import os
+import sys
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import documents
+
+
+def payload(i):
+    return {
+        'society': 'default',
+        'society_name': 'Bench Society',
+        'bill_number': f'BILL/2026/1/{i}',
+        'period': 'Jan 2026',
+        'member_name': f'Member {i}',
+        'flat_no': str(100 + i % 900),
+        'due_date': '10-02-2026',
+        'status': 'Unpaid',
+        'charges': [('Maintenance', 1000.0), ('Sinking Fund', 200.0), ('Parking', 100.0),
+                    ('Water', 150.0), ('Electricity', 300.0), ('Garbage', 50.0)],
+        'subtotal': 1800.0,
+        'late_fee': 0.0,
+        'discount': 0.0,
+        'total_amount': 1800.0,
+        'paid_date': None,
+        'payment_method': None,
+        'transaction_id': None,
+    }
+
+
+def run(jobs, workers):
+    cache_dir = tempfile.mkdtemp()
+    jobs = [(cache_dir, kind, key, data) for _, kind, key, data in jobs]
+    start = time.perf_counter()
+    if workers == 0:
+        for job in jobs:
+            documents._write_document(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=documents._init_worker) as pool:
+            list(pool.map(documents._write_document, jobs, chunksize=16))
+    elapsed = time.perf_counter() - start
+
+    # Second pass over a warm cache: every document is skipped
+    start = time.perf_counter()
+    for job in jobs:
+        documents._write_document(job)
+    cached = time.perf_counter() - start
+
+    shutil.rmtree(cache_dir)
+    return len(jobs) / elapsed, len(jobs) / cached
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cores = os.cpu_count() or 1
+    version = documents.template_version()
+    jobs = []
+    for i in range(count):
+        data = payload(i)
+        jobs.append((None, 'bill', documents.document_key('bill', data, version), data))
+
+    print(f"{count} bills, {cores} cores")
+    print(f"{'workers':<16}{'bills/s':>10}{'per core/s':>12}{'cached/s':>12}")
+    settings = [0] + sorted({1, max(1, cores // 2), cores})
+    for workers in settings:
+        rate, cached = run(jobs, workers)
+        label = 'in-process' if workers == 0 else f'{workers} process(es)'
+        print(f"{label:<16}{rate:>10.0f}{rate / max(1, workers):>12.0f}{cached:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# bench_passwords.py
+# Measures password verifications (logins) per second per core at several work factors.
+# Usage: python bench_passwords.py [seconds_per_setting]
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from passwords import PasswordHasher
+
+COST_SETTINGS = [
+    'scrypt:8192:8:1',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+]
+
+
+def measure(fn, seconds):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def measure_parallel(stored, workers, seconds):
+    deadline = time.perf_counter() + seconds
+
+    def loop():
+        n = 0
+        while time.perf_counter() < deadline:
+            check_password_hash(stored, 'correct horse')
+            n += 1
+        return n
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(lambda _: loop(), range(workers)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    cores = os.cpu_count() or 1
+
+    print(f"{cores} cores, {seconds:.0f}s per setting")
+    print(f"{'method':<24}{'1 thread/s':>12}{f'{cores} threads/s':>14}{'per core/s':>12}{'cached/s':>12}")
+
+    for method in COST_SETTINGS:
+        stored = generate_password_hash('correct horse', method=method)
+        single = measure(lambda: check_password_hash(stored, 'correct horse'), seconds)
+        parallel = measure_parallel(stored, cores, seconds)
+
+        hasher = PasswordHasher(method, workers=cores)
+        hasher.verify(stored, 'correct horse')
+        cached = measure(lambda: hasher.verify(stored, 'correct horse'), seconds / 4)
+        hasher.shutdown()
+
+        print(f"{method:<24}{single:>12.1f}{parallel:>14.1f}{parallel / cores:>12.1f}{cached:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
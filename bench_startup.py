@@ -0,0 +1,62 @@
+# bench_startup.py
+# Compares worker boot time with the lazy app factory against the old import-time
+# database setup (create_all + schema check + seed check on every worker).
+# Usage: python bench_startup.py [runs]
+import os
+import subprocess
+import sys
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+LAZY = '''
+import time
+start = time.perf_counter()
+import main
+imported = booted = time.perf_counter()
+main.app.test_client().get('/')
+print(imported - start, booted - start, time.perf_counter() - start)
+'''
+
+# What every worker used to do at import time
+EAGER = '''
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from extensions import db
+from models import User
+from schema import upgrade_schema
+with main.app.app_context():
+    db.create_all()
+    upgrade_schema(db.engine, db.metadata)
+    User.query.first()
+booted = time.perf_counter()
+main.app.test_client().get('/')
+print(imported - start, booted - start, time.perf_counter() - start)
+'''
+
+
+def run(code, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True, text=True, check=True)
+        samples.append([float(v) * 1000 for v in out.stdout.strip().splitlines()[-1].split()])
+    imported, booted, first = (statistics.median(col) for col in zip(*samples))
+    return imported, booted - imported, first
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', 'create-db'],
+                   cwd=HERE, capture_output=True, check=True)
+
+    print(f"median of {runs} cold starts")
+    print(f"{'':<28}{'import ms':>10}{'db setup ms':>13}{'first request ms':>20}")
+    for name, code in (('import-time DB setup', EAGER), ('lazy create_app()', LAZY)):
+        imported, setup, first = run(code, runs)
+        print(f"{name:<28}{imported:>10.1f}{setup:>13.1f}{first:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
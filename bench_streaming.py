@@ -0,0 +1,80 @@
+# bench_streaming.py
+# Time-to-first-byte, total time and peak Python memory of the admin billing page, streamed
+# through stream_page() versus rendering the whole listing into one string first.
+# Usage: python bench_streaming.py [bill_count]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+import main as views
+from main import create_app, seed
+from extensions import db
+import sample_data
+from flask import render_template
+
+
+def populate(bill_count):
+    db.create_all()
+    sample_data.add_members(200)
+    sample_data.add_bills(bill_count, 200, month=lambda i: i % 12 + 1)
+
+
+def buffered_page(template_name, **context):
+    # What the views did before: materialise every row, then render the page in one go
+    for key, value in context.items():
+        if hasattr(value, '__iter__') and not isinstance(value, (str, bytes, dict)):
+            context[key] = list(value)
+    return render_template(template_name, **context)
+
+
+def fetch(client, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(path, buffered=False)
+    chunks = iter(response.response)
+    first = next(chunks, b'')
+    ttfb = time.perf_counter() - start
+    size = len(first) + sum(len(chunk) for chunk in chunks)
+    total = time.perf_counter() - start
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, ttfb, total, peak
+
+
+def measure(client, label):
+    fetch(client, '/admin/billing')  # warm template cache
+    runs = [fetch(client, '/admin/billing') for _ in range(3)]
+    size = runs[-1][0]
+    ttfb, total, peak = (sorted(run[i] for run in runs)[1] for i in (1, 2, 3))
+    print(f"{label:<10}{size:>10}{ttfb * 1000:>10.1f}{total * 1000:>10.1f}{peak / 1024 / 1024:>10.1f}")
+
+
+def main():
+    bill_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = create_app('production')
+    app.config['RATELIMIT_ENABLED'] = False
+    with app.app_context():
+        populate(bill_count)
+    app.test_cli_runner().invoke(seed)
+
+    client = app.test_client()
+    sample_data.login(client)
+
+    print(f"/admin/billing with {bill_count} bills")
+    print(f"{'mode':<10}{'bytes':>10}{'ttfb ms':>10}{'total ms':>10}{'peak MB':>10}")
+    measure(client, 'streamed')
+    streamed = views.stream_page
+    views.stream_page = buffered_page
+    try:
+        measure(client, 'buffered')
+    finally:
+        views.stream_page = streamed
+
+
+if __name__ == '__main__':
+    main()
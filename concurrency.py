@@ -0,0 +1,52 @@
+# concurrency.py
+from extensions import db
+from sqlalchemy.orm.exc import StaleDataError
+import threading
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {'commits': 0, 'conflicts': 0, 'gave_up': 0}
+
+
+class ConflictError(Exception):
+    """Another writer kept changing the same rows until the retries ran out."""
+
+
+def _count(key):
+    with _lock:
+        _stats[key] += 1
+
+
+def run_with_retry(apply, attempts=3, backoff=0.005):
+    """
+    Run apply() and commit it. MaintenanceBill and Complaint carry a version
+    column, so a flush that touches a row someone else changed since it was
+    read raises StaleDataError; the transaction is then rolled back and apply()
+    is run again against freshly loaded rows.
+
+    apply() must therefore be safe to repeat: load the rows it changes itself
+    and re-check its preconditions (status, expected version) on every call.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            result = apply()
+            db.session.commit()
+            _count('commits')
+            return result
+        except StaleDataError:
+            db.session.rollback()
+            _count('conflicts')
+            if attempt == attempts:
+                _count('gave_up')
+                logger.warning('Update still conflicting after %d attempts', attempts)
+                raise ConflictError('The record was changed by someone else. Please try again.')
+            time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
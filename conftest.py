@@ -0,0 +1,37 @@
+# conftest.py
+import pytest
+
+from main import create_app, init_db
+from extensions import db
+
+
+@pytest.fixture
+def app_settings():
+    """Extra config for the app fixture; override in a test module to change it."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_settings):
+    """App on a throwaway SQLite file, loaded with the `flask init-db` sample data."""
+    settings = dict(
+        SQLALCHEMY_DATABASE_URI='sqlite:///' + str(tmp_path / 'society.db'),
+        SOCIETY_DB_DIR=str(tmp_path / 'societies'),
+        DOCUMENT_CACHE_DIR=str(tmp_path / 'documents'),
+        BACKUP_DIR=str(tmp_path / 'backups'),
+        PROFILE_DIR=str(tmp_path / 'profiles'),
+        OUTBOX_TRANSPORTS={'email': 'file://' + str(tmp_path / 'outbox')},
+    )
+    settings.update(app_settings)
+    app = create_app('testing', **settings)
+    app.test_cli_runner().invoke(init_db)
+    yield app
+    app.extensions['audit'].close()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
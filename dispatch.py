@@ -0,0 +1,190 @@
+# dispatch.py
+from extensions import db
+from models import Complaint, Staff, ComplaintSlaStats
+from datetime import datetime, timedelta
+
+PRIORITY_RANKS = {'Urgent': 0, 'High': 1, 'Medium': 2, 'Low': 3}
+SLA_HOURS = {'Urgent': 4, 'High': 24, 'Medium': 72, 'Low': 168}
+OPEN_STATUSES = ['Pending', 'In Progress']
+CLOSED_STATUS = 'Completed'
+
+
+def _priority(complaint):
+    return complaint.priority if complaint.priority in PRIORITY_RANKS else 'Medium'
+
+
+def _category(complaint):
+    return complaint.category or 'General'
+
+
+# ===== ASSIGNMENT =====
+def pick_staff(category):
+    """
+    Least-loaded active staff member for the category, falling back to
+    General staff. Served from the (category, active, open_count) index.
+    """
+    for cat in (category, 'General'):
+        staff = Staff.query.filter_by(category=cat, active=True).order_by(
+            Staff.open_count, Staff.id
+        ).first()
+        if staff:
+            return staff
+    return None
+
+
+def _assign(complaint, staff):
+    complaint.staff_id = staff.id
+    complaint.assigned_to = staff.name
+    # Incremented in SQL so concurrent assignments don't lose updates
+    staff.open_count = Staff.open_count + 1
+
+
+def _release(complaint):
+    if complaint.staff_id:
+        Staff.query.filter_by(id=complaint.staff_id).update(
+            {Staff.open_count: Staff.open_count - 1}, synchronize_session=False)
+
+
+# ===== SLA STATS =====
+def _record_resolution(complaint, sign=1):
+    category = _category(complaint)
+    stats = ComplaintSlaStats.query.filter_by(category=category).first()
+    if stats is None:
+        stats = ComplaintSlaStats(category=category, resolved_count=0,
+                                  resolve_seconds_total=0, breached_count=0)
+        db.session.add(stats)
+        db.session.flush()
+
+    stats.resolved_count = ComplaintSlaStats.resolved_count + sign
+    stats.resolve_seconds_total = ComplaintSlaStats.resolve_seconds_total + sign * (complaint.resolve_seconds or 0)
+    if complaint.sla_breached:
+        stats.breached_count = ComplaintSlaStats.breached_count + sign
+
+
+# ===== LIFECYCLE HOOKS =====
+def on_created(complaint):
+    """Rank, set the SLA deadline and auto-assign a new complaint. Call before commit."""
+    complaint.date_requested = complaint.date_requested or datetime.now()
+    priority = _priority(complaint)
+    complaint.priority_rank = PRIORITY_RANKS[priority]
+    complaint.sla_due = complaint.date_requested + timedelta(hours=SLA_HOURS[priority])
+
+    staff = pick_staff(complaint.category)
+    if staff:
+        _assign(complaint, staff)
+
+
+def on_status_change(complaint, old_status):
+    """Keep staff load and SLA stats in step with a status change. Call before commit."""
+    was_closed = old_status == CLOSED_STATUS
+    is_closed = complaint.status == CLOSED_STATUS
+    if was_closed == is_closed:
+        return
+
+    if is_closed:
+        resolved = complaint.resolved_date or datetime.now()
+        complaint.resolve_seconds = int((resolved - complaint.date_requested).total_seconds())
+        complaint.sla_breached = bool(complaint.sla_due and resolved > complaint.sla_due)
+        _release(complaint)
+        _record_resolution(complaint)
+    else:
+        # Reopened: take it back out of the stats and put it back on the staff member's load
+        _record_resolution(complaint, sign=-1)
+        complaint.resolved_date = None
+        complaint.resolve_seconds = None
+        complaint.sla_breached = None
+        if complaint.staff_id:
+            Staff.query.filter_by(id=complaint.staff_id).update(
+                {Staff.open_count: Staff.open_count + 1}, synchronize_session=False)
+
+
+def on_deleted(complaint):
+    """Call before deleting a complaint."""
+    if complaint.status == CLOSED_STATUS:
+        _record_resolution(complaint, sign=-1)
+    else:
+        _release(complaint)
+
+
+# ===== READS =====
+def open_queue(limit=10):
+    """Open complaints, most urgent and oldest first, read straight off the queue index."""
+    return Complaint.query.filter(
+        Complaint.status.in_(OPEN_STATUSES)
+    ).order_by(Complaint.priority_rank, Complaint.date_requested).limit(limit).all()
+
+
+def sla_summary():
+    open_breached = Complaint.query.filter(
+        Complaint.status.in_(OPEN_STATUSES),
+        Complaint.sla_due < datetime.now()
+    ).count()
+
+    categories = []
+    resolved = seconds = breached = 0
+    for row in ComplaintSlaStats.query.order_by(ComplaintSlaStats.category):
+        if not row.resolved_count:
+            continue
+        resolved += row.resolved_count
+        seconds += row.resolve_seconds_total
+        breached += row.breached_count
+        categories.append({
+            'category': row.category,
+            'resolved': row.resolved_count,
+            'mean_hours': row.resolve_seconds_total / row.resolved_count / 3600,
+            'breach_rate': row.breached_count / row.resolved_count,
+        })
+
+    return {
+        'open_breached': open_breached,
+        'resolved': resolved,
+        'mean_hours': seconds / resolved / 3600 if resolved else 0.0,
+        'breach_rate': breached / resolved if resolved else 0.0,
+        'categories': categories,
+    }
+
+
+# ===== REBUILD =====
+def backfill_ranks():
+    """
+    Rank complaints saved before priority_rank existed. SQLite sorts NULLs
+    first, so until then they would jump the queue. Run by create-db on every
+    deploy; a no-op once every complaint is ranked.
+    """
+    rank = db.case(PRIORITY_RANKS, value=Complaint.priority, else_=PRIORITY_RANKS['Medium'])
+    return Complaint.query.filter(Complaint.priority_rank.is_(None)).update(
+        {Complaint.priority_rank: rank}, synchronize_session=False)
+
+
+def rebuild():
+    """
+    Recompute ranks, SLA deadlines, staff load and SLA stats from scratch for
+    the current society. Used to backfill existing data or repair drift.
+    """
+    ComplaintSlaStats.query.delete(synchronize_session=False)
+    Staff.query.update({Staff.open_count: 0}, synchronize_session=False)
+
+    count = 0
+    for complaint in Complaint.query.yield_per(500):
+        priority = _priority(complaint)
+        complaint.priority_rank = PRIORITY_RANKS[priority]
+        if complaint.sla_due is None and complaint.date_requested:
+            complaint.sla_due = complaint.date_requested + timedelta(hours=SLA_HOURS[priority])
+        count += 1
+
+    db.session.flush()
+
+    for complaint in Complaint.query.filter_by(status=CLOSED_STATUS).all():
+        if complaint.resolved_date and complaint.date_requested:
+            complaint.resolve_seconds = int((complaint.resolved_date - complaint.date_requested).total_seconds())
+            complaint.sla_breached = bool(complaint.sla_due and complaint.resolved_date > complaint.sla_due)
+            _record_resolution(complaint)
+
+    loads = db.session.query(Complaint.staff_id, db.func.count(Complaint.id)).filter(
+        Complaint.status.in_(OPEN_STATUSES), Complaint.staff_id.isnot(None)
+    ).group_by(Complaint.staff_id)
+    for staff_id, open_count in loads:
+        Staff.query.filter_by(id=staff_id).update({Staff.open_count: open_count}, synchronize_session=False)
+
+    db.session.commit()
+    return count
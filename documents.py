@@ -0,0 +1,200 @@
+# documents.py
+from flask import current_app, has_app_context
+from jinja2 import Environment, FileSystemLoader
+from concurrent.futures import ProcessPoolExecutor
+from extensions import db
+from models import MaintenanceBill
+from functools import lru_cache
+import hashlib
+import json
+import os
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'documents')
+KINDS = {'bill': 'bill.txt', 'receipt': 'receipt.txt'}
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+LINES_PER_PAGE = 60
+
+
+# ===== PDF WRITER =====
+def _pdf_text(line):
+    text = line.encode('latin-1', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(lines):
+    """
+    Minimal text-only PDF (Courier, A4). Lines starting with '# ' are bold.
+    Enough for bills and receipts without pulling in a PDF library.
+    """
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    add(b'<< /Type /Catalog /Pages 2 0 R >>')
+    add(None)  # page tree, filled in once the page ids are known
+    regular = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+    bold = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>')
+
+    page_ids = []
+    for page in pages:
+        ops = ['BT', '13 TL', '50 790 Td']
+        for line in page:
+            font, line = (bold, line[2:]) if line.startswith('# ') else (regular, line)
+            ops.append(f'/F{font} 10 Tf ({_pdf_text(line)}) Tj T*')
+        ops.append('ET')
+        stream = '\n'.join(ops).encode('latin-1')
+        content = add(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F%d %d 0 R /F%d %d 0 R >> >> /Contents %d 0 R >>'
+            % (regular, regular, bold, bold, content)
+        ))
+
+    kids = ' '.join(f'{pid} 0 R' for pid in page_ids).encode()
+    objects[1] = b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % len(page_ids)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# ===== TEMPLATES =====
+_environment = None
+
+
+def _templates():
+    """Jinja environment compiled once per process (each pool worker gets its own)."""
+    global _environment
+    if _environment is None:
+        _environment = Environment(loader=FileSystemLoader(TEMPLATE_DIR), trim_blocks=True,
+                                   lstrip_blocks=True, auto_reload=False, cache_size=-1)
+        for name in KINDS.values():
+            _environment.get_template(name)
+    return _environment
+
+
+@lru_cache(maxsize=None)
+def template_version():
+    digest = hashlib.sha256()
+    for name in sorted(KINDS.values()):
+        with open(os.path.join(TEMPLATE_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def render(kind, payload):
+    text = _templates().get_template(KINDS[kind]).render(**payload)
+    return build_pdf(text.splitlines())
+
+
+# ===== CONTENT-ADDRESSED CACHE =====
+def _society_name(society):
+    names = current_app.config.get('SOCIETY_NAMES', {}) if has_app_context() else {}
+    return names.get(society, 'Society Management System')
+
+
+def bill_payload(bill):
+    """Plain, picklable view of a bill; the cache key is derived from it."""
+    return {
+        'society': bill.society_id,
+        'society_name': _society_name(bill.society_id),
+        'bill_number': bill.bill_number,
+        'period': f'{MONTHS[bill.month - 1]} {bill.year}',
+        'member_name': bill.member.name,
+        'flat_no': bill.member.flat_no,
+        'due_date': bill.due_date.strftime('%d-%m-%Y'),
+        'status': bill.status,
+        'charges': [
+            ('Maintenance', bill.maintenance_amount),
+            ('Sinking Fund', bill.sinking_fund),
+            ('Parking', bill.parking_fee),
+            ('Water', bill.water_charges),
+            ('Electricity', bill.electricity_charges),
+            ('Garbage', bill.garbage_fee),
+        ],
+        'subtotal': bill.subtotal,
+        'late_fee': bill.late_fee,
+        'discount': bill.discount,
+        'total_amount': bill.total_amount,
+        'paid_date': bill.paid_date.strftime('%d-%m-%Y') if bill.paid_date else None,
+        'payment_method': bill.payment_method,
+        'transaction_id': bill.transaction_id,
+    }
+
+
+def document_key(kind, payload, version):
+    blob = json.dumps([kind, version, payload], sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + '.pdf')
+
+
+def _write_document(job):
+    """Pool worker: render one document and store it under its content key."""
+    cache_dir, kind, key, payload = job
+    path = cache_path(cache_dir, key)
+    if os.path.exists(path):
+        return key, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(render(kind, payload))
+    os.replace(tmp, path)
+    return key, True
+
+
+def _init_worker():
+    _templates()
+
+
+def document_for(bill, kind, cache_dir):
+    """Path to the cached PDF for one bill, rendering it first if needed."""
+    payload = bill_payload(bill)
+    key = document_key(kind, payload, template_version())
+    _write_document((cache_dir, kind, key, payload))
+    return cache_path(cache_dir, key)
+
+
+def generate_period(month, year, cache_dir, workers=None, chunksize=16):
+    """
+    Render bills (and receipts for paid bills) for one billing period across a
+    process pool. Documents already in the cache are skipped without rendering.
+    Returns (rendered, cached) counts.
+    """
+    version = template_version()
+    jobs = []
+    cached = 0
+    bills = MaintenanceBill.query.filter_by(month=month, year=year).options(
+        db.joinedload(MaintenanceBill.member)).all()
+    for bill in bills:
+        payload = bill_payload(bill)
+        kinds = ['bill', 'receipt'] if bill.status == 'Paid' else ['bill']
+        for kind in kinds:
+            key = document_key(kind, payload, version)
+            if os.path.exists(cache_path(cache_dir, key)):
+                cached += 1
+            else:
+                jobs.append((cache_dir, kind, key, payload))
+
+    if not jobs:
+        return 0, cached
+
+    rendered = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for _, created in pool.map(_write_document, jobs, chunksize=chunksize):
+            rendered += created
+    return rendered, cached
@@ -1,7 +1,9 @@
 # extensions.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from tenancy import SocietySession
+from ratelimit import RateLimiter
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SocietySession})
 login_manager = LoginManager()
-
+limiter = RateLimiter()
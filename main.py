@@ -1,113 +1,151 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, Response, current_app, render_template, stream_template, get_flashed_messages, request, redirect, url_for, flash, jsonify, send_file, abort
+from flask.cli import with_appcontext
 from flask_login import login_user, login_required, logout_user, current_user
-from extensions import db, login_manager
-from models import User, Member, Complaint, MaintenanceBill, Notice
+from werkzeug.exceptions import HTTPException
+from extensions import db, login_manager, limiter
+from models import User, Member, Complaint, MaintenanceBill, Notice, Staff
+from receivables import compute_aging, AGING_BUCKETS
+from schema import upgrade_schema
+from passwords import hash_password, check_login, HasherBusy
+from config import config, instance_path
+import passwords
+import tenancy
+import dispatch
+import documents
+import outbox
+import archive
+import replicas
+import backup
+import profiler
+import assets
+import audit
+import analytics
+from replicas import read_only
+from concurrency import run_with_retry, ConflictError
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 import random
+import click
 import os
+import sys
+import heapq
+import logging
 
 
+# ===== ROUTE REGISTRY =====
+# Views are collected here and attached to each app in create_app(), which
+# keeps their endpoint names (url_for('admin_dashboard')) unchanged.
+_routes = []
 
-app = Flask(__name__)
-import sys
-import logging
+def route(rule, **options):
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
 
-# Set up logging
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+# ===== STREAMED PAGES =====
+STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_BATCH_SIZE = 500
+
+def stream_page(template_name, **context):
+    """
+    Render a template as it is sent. Pass row sources as lazy queries
+    (yield_per) so the header and first rows go out before the last row is
+    read, and memory stays flat however long the table is. Jinja's many small
+    pieces are gathered into STREAM_CHUNK_SIZE writes.
+    """
+    # Pop flashes now: the session cookie is already sent by the time base.html asks for them
+    get_flashed_messages(with_categories=True)
+    pieces = stream_template(template_name, **context)
+    
+    def chunks():
+        buffer, size = [], 0
+        for piece in pieces:
+            buffer.append(piece)
+            size += len(piece)
+            if size >= STREAM_CHUNK_SIZE:
+                yield ''.join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield ''.join(buffer)
+    
+    return Response(chunks(), mimetype='text/html')
 
 # Add this error handler
-@app.errorhandler(500)
 def internal_error(error):
     return "500 error: {}".format(str(error)), 500
 
-@app.errorhandler(Exception)
 def handle_exception(e):
+    # Let 404s and other HTTP errors through unchanged
+    if isinstance(e, HTTPException):
+        return e
     # Log the error
-    app.logger.error(f"Unhandled exception: {str(e)}")
+    current_app.logger.error(f"Unhandled exception: {str(e)}")
     return "Unhandled exception: {}".format(str(e)), 500
-# ===== SECRET KEY CONFIGURATION =====
-app.config['SECRET_KEY'] = 'your-secret-key-here-change-this-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///society.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-import os
-
-# Get the absolute path to the instance folder
-basedir = os.path.abspath(os.path.dirname(__file__))
-instance_path = os.path.join(basedir, 'instance')
 
-# Ensure instance folder exists
-os.makedirs(instance_path, exist_ok=True)
+# ===== APP FACTORY =====
+def create_app(config_name='default', **settings):
+    """
+    Build a configured app. Nothing here touches the database: tables are
+    created with `flask create-db` and default users with `flask seed`, run
+    once per deploy instead of once per worker. Keyword arguments override
+    config values (tests point the database and file stores at a temp dir).
+    """
+    app = Flask(__name__)
+    app.config.from_object(config[config_name])
+    app.config.update(settings)
+    
+    # Set up logging
+    logging.basicConfig(stream=sys.stdout, level=app.config['LOG_LEVEL'])
+    
+    # Ensure instance folder exists
+    os.makedirs(instance_path, exist_ok=True)
+    
+    # Initialize extensions with app
+    db.init_app(app)
+    tenancy.init_app(app, db)
+    replicas.init_app(app)
+    passwords.init_app(app)
+    login_manager.init_app(app)
+    limiter.init_app(app)
+    profiler.init_app(app)
+    assets.init_app(app)
+    audit.init_app(app)
+    login_manager.login_view = 'login'
+    
+    app.register_error_handler(500, internal_error)
+    app.register_error_handler(Exception, handle_exception)
+    
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    
+    app.cli.add_command(create_db)
+    app.cli.add_command(seed)
+    app.cli.add_command(init_db)
+    app.cli.add_command(rebuild_dispatch)
+    app.cli.add_command(rebuild_analytics)
+    app.cli.add_command(generate_documents)
+    app.cli.add_command(outbox_drain)
+    app.cli.add_command(archive_history)
+    app.cli.add_command(replica_sync)
+    app.cli.add_command(backup_databases)
+    app.cli.add_command(verify_backup)
+    app.cli.add_command(restore_backup)
+    app.cli.add_command(build_assets)
+    
+    return app
 
-# Update database URI
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(instance_path, 'society.db')
-
-# Initialize extensions with app
-db.init_app(app)
-login_manager.init_app(app)
-login_manager.login_view = 'login'
-
-# Database initialization for production
-with app.app_context():
-    try:
-        # Create instance folder if it doesn't exist
-        import os
-        instance_path = os.path.join(os.path.dirname(__file__), 'instance')
-        os.makedirs(instance_path, exist_ok=True)
-        
-        # Create all tables
-        db.create_all()
-        print("✅ Database tables created/verified")
-        
-        # Create default admin if not exists
-        from models import User, Member
-        if not User.query.first():
-            print("📝 Creating default users...")
-            
-            # Admin user
-            admin = User(
-                username='admin', 
-                password='admin123', 
-                role='admin', 
-                email='admin@society.com'
-            )
-            db.session.add(admin)
-            
-            # Resident user
-            resident = User(
-                username='john', 
-                password='john123', 
-                role='resident', 
-                email='john@example.com'
-            )
-            db.session.add(resident)
-            db.session.flush()
-            
-            # Member record
-            member = Member(
-                name='John Doe', 
-                flat_no='101', 
-                contact='9876543210', 
-                email='john@example.com', 
-                member_type='Owner'
-            )
-            db.session.add(member)
-            
-            db.session.commit()
-            print("✅ Default users created successfully!")
-            
-    except Exception as e:
-        print(f"⚠️ Database initialization error: {e}")
-        # Don't crash the app, just log the error
-        
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Session ids are "<society>:<id>" so a login never carries over to another society
+    society, _, uid = user_id.rpartition(':')
+    if society != tenancy.current_society():
+        return None
+    return User.query.get(int(uid))
 
 
-@app.route('/debug')
+@route('/debug')
 def debug():
     import sys
     import os
@@ -120,7 +158,7 @@ def debug():
     return str(info)
 
 
-@app.route('/debug-imports')
+@route('/debug-imports')
 def debug_imports():
     import importlib
     results = []
@@ -136,12 +174,13 @@ def debug_imports():
     return "<br>".join(results)
 
 # ===== ROOT ROUTE =====
-@app.route('/')
+@route('/')
 def index():
     return render_template('index.html')
 
 # ===== AUTH ROUTES =====
-@app.route('/login', methods=['GET', 'POST'])
+@route('/login', methods=['GET', 'POST'])
+@limiter.limit('login')
 def login():
     if request.method == 'POST':
         username = request.form.get('username')
@@ -149,7 +188,13 @@ def login():
         
         user = User.query.filter_by(username=username).first()
         
-        if user and user.password == password:
+        try:
+            valid = check_login(user, password)
+        except HasherBusy:
+            flash('Too many login attempts right now, please try again in a moment.', 'warning')
+            return redirect(url_for('login'))
+        
+        if valid:
             login_user(user)
             flash('Logged in successfully!', 'success')
             
@@ -163,7 +208,7 @@ def login():
     
     return render_template('login.html')
 
-@app.route('/logout')
+@route('/logout')
 @login_required
 def logout():
     logout_user()
@@ -171,8 +216,9 @@ def logout():
     return redirect(url_for('index'))
 
 # ===== ADMIN DASHBOARD =====
-@app.route('/admin/dashboard')
+@route('/admin/dashboard')
 @login_required
+@read_only
 def admin_dashboard():
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
@@ -208,17 +254,19 @@ def admin_dashboard():
                          bills=bills)
 
 # ===== MEMBER MANAGEMENT =====
-@app.route('/admin/members')
+@route('/admin/members')
 @login_required
+@read_only
 def admin_members():
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
         return redirect(url_for('resident_dashboard'))
     
-    members = Member.query.all()
-    return render_template('admin/members.html', members=members)
+    return stream_page('admin/members.html',
+                       members=Member.query.yield_per(STREAM_BATCH_SIZE),
+                       member_count=Member.query.count())
 
-@app.route('/admin/members/delete/<int:id>')
+@route('/admin/members/delete/<int:id>')
 @login_required
 def delete_member(id):
     if current_user.role != 'admin':
@@ -237,13 +285,15 @@ def delete_member(id):
     if user:
         db.session.delete(user)
     
+    audit.record('member.deleted', 'member', member.id, f'{member.name} (flat {member.flat_no})',
+                 email=member.email, member_type=member.member_type, user_id=user.id if user else None)
     db.session.delete(member)
     db.session.commit()
     flash('Member deleted successfully!', 'success')
     return redirect(url_for('admin_members'))
 
 # ===== CREATE RESIDENT ACCOUNT =====
-@app.route('/admin/create-resident', methods=['GET', 'POST'])
+@route('/admin/create-resident', methods=['GET', 'POST'])
 @login_required
 def create_resident():
     if current_user.role != 'admin':
@@ -272,7 +322,7 @@ def create_resident():
             return redirect(url_for('create_resident'))
         
         # Create new user (resident)
-        new_user = User(username=username, password=password, role='resident', email=email)
+        new_user = User(username=username, password=hash_password(password), role='resident', email=email)
         db.session.add(new_user)
         db.session.flush()  # To get the user ID
         
@@ -294,48 +344,83 @@ def create_resident():
 
 
 # ===== COMPLAINTS MANAGEMENT =====
-@app.route('/admin/complaints')
+@route('/admin/complaints')
 @login_required
+@read_only
 def admin_complaints():
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
         return redirect(url_for('resident_dashboard'))
     
-    complaints = Complaint.query.order_by(Complaint.date_requested.desc()).all()
+    history = request.args.get('history') == '1'
+    complaints = Complaint.query.options(db.joinedload(Complaint.member)).order_by(
+        Complaint.date_requested.desc()).yield_per(STREAM_BATCH_SIZE)
+    if history:
+        archived = sorted(archive.history('complaint'), key=lambda c: c.date_requested, reverse=True)
+        complaints = heapq.merge(complaints, archived, key=lambda c: c.date_requested, reverse=True)
     members = Member.query.all()
     
-    # Statistics
-    total = len(complaints)
-    pending = Complaint.query.filter_by(status='Pending').count()
-    in_progress = Complaint.query.filter_by(status='In Progress').count()
-    completed = Complaint.query.filter_by(status='Completed').count()
-    
-    return render_template('admin/complaints.html', 
+    # Statistics (one grouped count instead of a query per status); archived complaints are all Completed
+    counts = dict(db.session.query(Complaint.status, db.func.count(Complaint.id)).group_by(Complaint.status).all())
+    archived_count, _ = archive.totals('complaint')
+    total = sum(counts.values()) + archived_count
+    complaint_count = total if history else total - archived_count
+    pending = counts.get('Pending', 0)
+    in_progress = counts.get('In Progress', 0)
+    completed = counts.get('Completed', 0) + archived_count
+    
+    # Dispatch queue, staff workload and SLA metrics
+    queue = dispatch.open_queue(limit=10)
+    staff = Staff.query.order_by(Staff.category, Staff.name).all()
+    sla = dispatch.sla_summary()
+    
+    return stream_page('admin/complaints.html', 
                          complaints=complaints, 
+                         complaint_count=complaint_count,
                          members=members,
                          total=total,
                          pending=pending,
                          in_progress=in_progress,
-                         completed=completed)
+                         completed=completed,
+                         queue=queue,
+                         staff=staff,
+                         sla=sla,
+                         history=history,
+                         archived_count=archived_count,
+                         now=datetime.now())
 
-@app.route('/admin/complaints/update/<int:id>/<status>')
+@route('/admin/complaints/update/<int:id>/<status>')
 @login_required
 def update_complaint(id, status):
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
         return redirect(url_for('resident_dashboard'))
     
-    complaint = Complaint.query.get_or_404(id)
-    complaint.status = status
+    def apply():
+        complaint = Complaint.query.get_or_404(id)
+        old_status = complaint.status
+        complaint.status = status
+        
+        if status == 'Completed' and old_status != 'Completed':
+            complaint.resolved_date = datetime.now()
+        
+        analytics.on_status_change(complaint, old_status)
+        dispatch.on_status_change(complaint, old_status)
+        if status != old_status:
+            outbox.complaint_status_changed(complaint)
+            audit.record('complaint.status', 'complaint', complaint.id, f'{old_status} -> {status}',
+                         old_status=old_status, status=status)
     
-    if status == 'Completed':
-        complaint.resolved_date = datetime.now()
+    try:
+        run_with_retry(apply)
+    except ConflictError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin_complaints'))
     
-    db.session.commit()
     flash(f'Complaint marked as {status}!', 'success')
     return redirect(url_for('admin_complaints'))
 
-@app.route('/admin/complaints/add', methods=['POST'])
+@route('/admin/complaints/add', methods=['POST'])
 @login_required
 def add_complaint():
     if current_user.role != 'admin':
@@ -354,28 +439,88 @@ def add_complaint():
         priority=priority,
         status='Pending'
     )
+    dispatch.on_created(new_complaint)
+    analytics.on_created(new_complaint)
     db.session.add(new_complaint)
     db.session.commit()
     
     flash('Complaint added successfully!', 'success')
     return redirect(url_for('admin_complaints'))
 
-@app.route('/admin/complaints/delete/<int:id>')
+@route('/admin/complaints/delete/<int:id>')
 @login_required
 def delete_complaint(id):
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
         return redirect(url_for('resident_dashboard'))
     
-    complaint = Complaint.query.get_or_404(id)
-    db.session.delete(complaint)
-    db.session.commit()
+    def apply():
+        complaint = Complaint.query.get_or_404(id)
+        dispatch.on_deleted(complaint)
+        analytics.on_deleted(complaint)
+        audit.record('complaint.deleted', 'complaint', complaint.id, complaint.description[:100],
+                     member_id=complaint.member_id, category=complaint.category, status=complaint.status)
+        db.session.delete(complaint)
+    
+    try:
+        run_with_retry(apply)
+    except ConflictError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin_complaints'))
+    
     flash('Complaint deleted!', 'success')
     return redirect(url_for('admin_complaints'))
 
+@route('/admin/complaints/analytics.json')
+@login_required
+@read_only
+def complaint_analytics():
+    if current_user.role != 'admin':
+        flash('Access denied!', 'danger')
+        return redirect(url_for('resident_dashboard'))
+    
+    weeks = request.args.get('weeks', analytics.DEFAULT_WEEKS, type=int)
+    weeks = min(max(weeks, 1), analytics.MAX_WEEKS)
+    return jsonify(analytics.complaint_trends(weeks=weeks, category=request.args.get('category') or None))
+
+# ===== STAFF MANAGEMENT =====
+@route('/admin/staff/add', methods=['POST'])
+@login_required
+def add_staff():
+    if current_user.role != 'admin':
+        flash('Access denied!', 'danger')
+        return redirect(url_for('resident_dashboard'))
+    
+    staff = Staff(
+        name=request.form.get('name'),
+        category=request.form.get('category') or 'General',
+        active=True,
+        open_count=0
+    )
+    db.session.add(staff)
+    db.session.commit()
+    
+    flash(f'Staff member {staff.name} added!', 'success')
+    return redirect(url_for('admin_complaints'))
+
+@route('/admin/staff/toggle/<int:id>')
+@login_required
+def toggle_staff(id):
+    if current_user.role != 'admin':
+        flash('Access denied!', 'danger')
+        return redirect(url_for('resident_dashboard'))
+    
+    staff = Staff.query.get_or_404(id)
+    staff.active = not staff.active
+    db.session.commit()
+    
+    flash(f"{staff.name} is now {'active' if staff.active else 'inactive'}.", 'success')
+    return redirect(url_for('admin_complaints'))
+
 # ===== MAINTENANCE BILLING ROUTES =====
-@app.route('/admin/billing')
+@route('/admin/billing')
 @login_required
+@read_only
 def admin_billing():
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
@@ -384,29 +529,54 @@ def admin_billing():
     current_month = datetime.now().month
     current_year = datetime.now().year
     
-    bills = MaintenanceBill.query.order_by(MaintenanceBill.year.desc(), MaintenanceBill.month.desc()).all()
+    history = request.args.get('history') == '1'
+    bills = MaintenanceBill.query.options(db.joinedload(MaintenanceBill.member)).order_by(
+        MaintenanceBill.year.desc(), MaintenanceBill.month.desc()).yield_per(STREAM_BATCH_SIZE)
+    if history:
+        bills = heapq.merge(bills, archive.history('bill'), key=lambda b: (b.year, b.month), reverse=True)
     members = Member.query.all()
     
-    # Statistics
-    total_collected = db.session.query(db.func.sum(MaintenanceBill.total_amount)).filter_by(status='Paid').scalar() or 0
+    # Statistics (archived bills are all Paid)
+    archived_count, archived_amount = archive.totals('bill')
+    bill_count = MaintenanceBill.query.count() + (archived_count if history else 0)
+    total_collected = (db.session.query(db.func.sum(MaintenanceBill.total_amount)).filter_by(status='Paid').scalar() or 0) + archived_amount
     pending_amount = db.session.query(db.func.sum(MaintenanceBill.total_amount)).filter(MaintenanceBill.status.in_(['Unpaid', 'Overdue'])).scalar() or 0
     overdue_count = MaintenanceBill.query.filter_by(status='Overdue').count()
-    paid_count = MaintenanceBill.query.filter_by(status='Paid').count()
+    paid_count = MaintenanceBill.query.filter_by(status='Paid').count() + archived_count
     unpaid_count = MaintenanceBill.query.filter_by(status='Unpaid').count()
     
-    return render_template('admin/billing.html', 
+    return stream_page('admin/billing.html', 
                          bills=bills, 
+                         bill_count=bill_count,
                          members=members,
                          total_collected=total_collected,
                          pending_amount=pending_amount,
                          overdue_count=overdue_count,
                          paid_count=paid_count,
                          unpaid_count=unpaid_count,
+                         history=history,
+                         archived_count=archived_count,
                          current_month=current_month,
                          current_year=current_year)
 
-@app.route('/admin/billing/generate', methods=['POST'])
+@route('/admin/billing/aging')
 @login_required
+@read_only
+def admin_aging():
+    if current_user.role != 'admin':
+        flash('Access denied!', 'danger')
+        return redirect(url_for('resident_dashboard'))
+    
+    top_k = request.args.get('top', 10, type=int)
+    aging = compute_aging(top_k=max(1, min(top_k, 100)))
+    
+    return render_template('admin/aging.html',
+                         aging=aging,
+                         buckets=AGING_BUCKETS)
+
+@route('/admin/billing/generate', methods=['POST'])
+@login_required
+@limiter.limit('billing')
 def generate_bill():
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
@@ -467,13 +637,15 @@ def generate_bill():
     
     bill.calculate_totals()
     db.session.add(bill)
+    outbox.bill_created(bill, member)
     db.session.commit()
     
     flash(f'Bill generated successfully for {member.name}!', 'success')
     return redirect(url_for('admin_billing'))
 
-@app.route('/admin/billing/generate-all/<int:month>/<int:year>')
+@route('/admin/billing/generate-all/<int:month>/<int:year>')
 @login_required
+@limiter.limit('billing', methods=('GET',))
 def generate_all_bills(month, year):
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
@@ -517,45 +689,78 @@ def generate_all_bills(month, year):
             )
             bill.calculate_totals()
             db.session.add(bill)
+            outbox.bill_created(bill, member)
             count += 1
     
     db.session.commit()
     flash(f'Generated {count} bills for {month}/{year}!', 'success')
     return redirect(url_for('admin_billing'))
 
-@app.route('/admin/billing/mark-paid/<int:id>', methods=['POST'])
+@route('/admin/billing/mark-paid/<int:id>', methods=['POST'])
 @login_required
 def mark_bill_paid(id):
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
         return redirect(url_for('resident_dashboard'))
     
-    bill = MaintenanceBill.query.get_or_404(id)
-    bill.status = 'Paid'
-    bill.paid_date = date.today()
-    bill.payment_method = request.form.get('payment_method')
-    bill.transaction_id = request.form.get('transaction_id')
+    expected_version = request.form.get('version', type=int)
     
-    db.session.commit()
-    flash(f'Bill marked as paid!', 'success')
+    def apply():
+        bill = MaintenanceBill.query.get_or_404(id)
+        if bill.status == 'Paid':
+            return 'already_paid'
+        if expected_version is not None and bill.version != expected_version:
+            return 'changed'
+        bill.status = 'Paid'
+        bill.paid_date = date.today()
+        bill.payment_method = request.form.get('payment_method')
+        bill.transaction_id = request.form.get('transaction_id')
+        audit.record('bill.paid', 'bill', bill.id, f'{bill.bill_number} ₹{bill.total_amount:.2f}',
+                     amount=bill.total_amount, payment_method=bill.payment_method,
+                     transaction_id=bill.transaction_id, member_id=bill.member_id)
+        return 'paid'
+    
+    try:
+        outcome = run_with_retry(apply)
+    except ConflictError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin_billing'))
+    
+    if outcome == 'already_paid':
+        flash('Bill was already marked as paid.', 'info')
+    elif outcome == 'changed':
+        flash('This bill was updated by someone else. Please check the amount and try again.', 'warning')
+    else:
+        flash(f'Bill marked as paid!', 'success')
     return redirect(url_for('admin_billing'))
 
-@app.route('/admin/billing/delete/<int:id>')
+@route('/admin/billing/delete/<int:id>')
 @login_required
 def delete_bill(id):
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
         return redirect(url_for('resident_dashboard'))
     
-    bill = MaintenanceBill.query.get_or_404(id)
-    db.session.delete(bill)
-    db.session.commit()
+    def apply():
+        bill = MaintenanceBill.query.get_or_404(id)
+        audit.record('bill.deleted', 'bill', bill.id, f'{bill.bill_number} ₹{bill.total_amount:.2f}',
+                     amount=bill.total_amount, status=bill.status, member_id=bill.member_id,
+                     month=bill.month, year=bill.year)
+        db.session.delete(bill)
+    
+    try:
+        run_with_retry(apply)
+    except ConflictError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin_billing'))
+    
     flash('Bill deleted!', 'success')
     return redirect(url_for('admin_billing'))
 
 # ===== NOTICES MANAGEMENT =====
-@app.route('/admin/notices')
+@route('/admin/notices')
 @login_required
+@read_only
 def admin_notices():
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
@@ -564,7 +769,7 @@ def admin_notices():
     notices = Notice.query.order_by(Notice.date_posted.desc()).all()
     return render_template('admin/notices.html', notices=notices)
 
-@app.route('/admin/notices/add', methods=['POST'])
+@route('/admin/notices/add', methods=['POST'])
 @login_required
 def add_notice():
     if current_user.role != 'admin':
@@ -576,12 +781,14 @@ def add_notice():
     
     new_notice = Notice(title=title, content=content, posted_by=current_user.id)
     db.session.add(new_notice)
+    db.session.flush()
+    audit.record('notice.posted', 'notice', new_notice.id, title)
     db.session.commit()
     
     flash('Notice posted successfully!', 'success')
     return redirect(url_for('admin_notices'))
 
-@app.route('/admin/notices/delete/<int:id>')
+@route('/admin/notices/delete/<int:id>')
 @login_required
 def delete_notice(id):
     if current_user.role != 'admin':
@@ -589,14 +796,16 @@ def delete_notice(id):
         return redirect(url_for('resident_dashboard'))
     
     notice = Notice.query.get_or_404(id)
+    audit.record('notice.deleted', 'notice', notice.id, notice.title, content=notice.content)
     db.session.delete(notice)
     db.session.commit()
     flash('Notice deleted successfully!', 'success')
     return redirect(url_for('admin_notices'))
 
 # ===== RESIDENT DASHBOARD =====
-@app.route('/resident/dashboard')
+@route('/resident/dashboard')
 @login_required
+@read_only
 def resident_dashboard():
     member = Member.query.filter_by(email=current_user.email).first()
     
@@ -628,8 +837,10 @@ def resident_dashboard():
 
 
 # ===== RESIDENT COMPLAINTS =====
-@app.route('/resident/complaints', methods=['GET', 'POST'])
+@route('/resident/complaints', methods=['GET', 'POST'])
 @login_required
+@limiter.limit('complaint')
+@read_only
 def resident_complaints():
     member = Member.query.filter_by(email=current_user.email).first()
     
@@ -645,6 +856,8 @@ def resident_complaints():
             priority=priority,
             status='Pending'
         )
+        dispatch.on_created(new_complaint)
+        analytics.on_created(new_complaint)
         db.session.add(new_complaint)
         db.session.commit()
         flash('Complaint submitted successfully!', 'success')
@@ -658,15 +871,21 @@ def resident_complaints():
     return render_template('resident/complaints.html', complaints=complaints)
 
 # ===== RESIDENT BILLS =====
-@app.route('/resident/bills')
+@route('/resident/bills')
 @login_required
+@read_only
 def resident_bills():
     member = Member.query.filter_by(email=current_user.email).first()
+    history = request.args.get('history') == '1'
     
     if member:
         bills = MaintenanceBill.query.filter_by(member_id=member.id).order_by(MaintenanceBill.year.desc(), MaintenanceBill.month.desc()).all()
         total_paid = db.session.query(db.func.sum(MaintenanceBill.total_amount)).filter_by(member_id=member.id, status='Paid').scalar() or 0
         total_due = db.session.query(db.func.sum(MaintenanceBill.total_amount)).filter_by(member_id=member.id).filter(MaintenanceBill.status.in_(['Unpaid', 'Overdue'])).scalar() or 0
+        if history:
+            archived = archive.history('bill', member_id=member.id)
+            total_paid += sum(bill.total_amount for bill in archived)
+            bills += archived
     else:
         bills = []
         total_paid = 0
@@ -675,10 +894,11 @@ def resident_bills():
     return render_template('resident/bills.html', 
                          bills=bills, 
                          total_paid=total_paid,
-                         total_due=total_due)
+                         total_due=total_due,
+                         history=history)
 
 # ===== RESIDENT PAY BILL =====
-@app.route('/resident/bills/pay/<int:id>', methods=['GET', 'POST'])
+@route('/resident/bills/pay/<int:id>', methods=['GET', 'POST'])
 @login_required
 def pay_bill(id):
     bill = MaintenanceBill.query.get_or_404(id)
@@ -689,233 +909,559 @@ def pay_bill(id):
         return redirect(url_for('resident_bills'))
     
     if request.method == 'POST':
-        bill.status = 'Paid'
-        bill.paid_date = date.today()
-        bill.payment_method = request.form.get('payment_method')
-        bill.transaction_id = request.form.get('transaction_id')
-        bill.remarks = request.form.get('remarks')
+        expected_version = request.form.get('version', type=int)
         
-        db.session.commit()
-        flash('Payment successful! Thank you.', 'success')
+        def apply():
+            bill = MaintenanceBill.query.get_or_404(id)
+            if bill.status == 'Paid':
+                return 'already_paid'
+            # The resident agreed to the amount on the page they submitted from
+            if expected_version is not None and bill.version != expected_version:
+                return 'changed'
+            bill.status = 'Paid'
+            bill.paid_date = date.today()
+            bill.payment_method = request.form.get('payment_method')
+            bill.transaction_id = request.form.get('transaction_id')
+            bill.remarks = request.form.get('remarks')
+            audit.record('bill.paid', 'bill', bill.id, f'{bill.bill_number} ₹{bill.total_amount:.2f}',
+                         amount=bill.total_amount, payment_method=bill.payment_method,
+                         transaction_id=bill.transaction_id, member_id=bill.member_id)
+            return 'paid'
+        
+        try:
+            outcome = run_with_retry(apply)
+        except ConflictError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('pay_bill', id=id))
+        
+        if outcome == 'changed':
+            flash('This bill was updated while you were paying. Please review the amount and pay again.', 'warning')
+            return redirect(url_for('pay_bill', id=id))
+        if outcome == 'already_paid':
+            flash('This bill has already been paid.', 'info')
+        else:
+            flash('Payment successful! Thank you.', 'success')
         return redirect(url_for('resident_bills'))
     
     return render_template('resident/pay_bill.html', bill=bill)
 
+# ===== BILL & RECEIPT PDFS =====
+@route('/bills/<int:id>/<kind>.pdf')
+@login_required
+@read_only
+def bill_document(id, kind):
+    if kind not in documents.KINDS:
+        abort(404)
+    
+    bill = MaintenanceBill.query.get_or_404(id)
+    
+    if current_user.role != 'admin':
+        member = Member.query.filter_by(email=current_user.email).first()
+        if not member or bill.member_id != member.id:
+            flash('Access denied!', 'danger')
+            return redirect(url_for('resident_bills'))
+    
+    if kind == 'receipt' and bill.status != 'Paid':
+        flash('A receipt is available once the bill is paid.', 'warning')
+        return redirect(request.referrer or url_for('resident_bills'))
+    
+    path = documents.document_for(bill, kind, current_app.config['DOCUMENT_CACHE_DIR'])
+    return send_file(path,
+                     mimetype='application/pdf',
+                     download_name=f"{kind}-{bill.bill_number.replace('/', '-')}.pdf",
+                     conditional=True)
+
 # ===== RESIDENT NOTICES =====
-@app.route('/resident/notices')
+@route('/resident/notices')
 @login_required
+@read_only
 def resident_notices():
     notices = Notice.query.order_by(Notice.date_posted.desc()).all()
     return render_template('resident/notices.html', notices=notices)
 
 # ===== UPDATE OVERDUE BILLS =====
-@app.route('/admin/update-overdue')
+@route('/admin/update-overdue')
 @login_required
 def update_overdue_bills():
     if current_user.role != 'admin':
         flash('Access denied!', 'danger')
         return redirect(url_for('resident_dashboard'))
     
-    bills = MaintenanceBill.query.filter_by(status='Unpaid').all()
-    count = 0
-    
-    for bill in bills:
-        if date.today() > bill.due_date:
+    def apply():
+        # Re-selected on every attempt, so a bill paid mid-sweep drops out instead of getting a late fee
+        bills = MaintenanceBill.query.filter(
+            MaintenanceBill.status == 'Unpaid',
+            MaintenanceBill.due_date < date.today()
+        ).all()
+        
+        for bill in bills:
             bill.status = 'Overdue'
             if bill.late_fee == 0:
                 bill.late_fee = 100.00
                 bill.calculate_totals()
-            count += 1
+                outbox.late_fee_applied(bill)
+        return len(bills)
     
-    db.session.commit()
+    try:
+        count = run_with_retry(apply, attempts=5)
+    except ConflictError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin_billing'))
+    
+    # Summarise what is still outstanding after the sweep
+    aging = compute_aging(top_k=0)
     flash(f'Updated {count} bills to overdue status!', 'success')
+    if aging['totals']['90+']:
+        flash(f"₹{aging['totals']['90+']:.2f} has been outstanding for more than 90 days.", 'warning')
     return redirect(url_for('admin_billing'))
 
+# ===== MONITORING =====
+@route('/admin/rate-limits')
+@login_required
+def rate_limit_stats():
+    if current_user.role != 'admin':
+        flash('Access denied!', 'danger')
+        return redirect(url_for('resident_dashboard'))
+    
+    return jsonify(limiter.stats())
+
+@route('/admin/audit')
+@login_required
+@read_only
+def admin_audit():
+    if current_user.role != 'admin':
+        flash('Access denied!', 'danger')
+        return redirect(url_for('resident_dashboard'))
+    
+    def day(name):
+        try:
+            return datetime.strptime(request.args.get(name, ''), '%Y-%m-%d')
+        except ValueError:
+            return None
+    
+    filters = {
+        'action': request.args.get('action') or None,
+        'entity': request.args.get('entity') or None,
+        'entity_id': request.args.get('entity_id', type=int),
+        'actor': request.args.get('actor') or None,
+        'since': day('since'),
+        'until': day('until'),
+    }
+    events, has_more = audit.search(before=request.args.get('before', type=int),
+                                    limit=current_app.config['AUDIT_PAGE_SIZE'], **filters)
+    return render_template('admin/audit.html',
+                         events=events,
+                         has_more=has_more,
+                         actions=audit.actions(),
+                         entities=('bill', 'complaint', 'member', 'notice'),
+                         query_args={k: v for k, v in request.args.items() if k != 'before'},
+                         queued=current_app.extensions['audit'].stats()['queued'])
+
 # ===== DATABASE INITIALIZATION =====
-@app.cli.command("init-db")
-def init_db():
-    with app.app_context():
-        # Drop all tables
-        db.drop_all()
+# Per-society commands run for every configured society unless --society picks one
+society_option = click.option("--society", default=None, help="Only this society (default: every configured society)")
+
+def selected_societies(society):
+    societies = sorted(tenancy.known_societies(current_app))
+    if society is None:
+        return societies
+    if society not in societies:
+        raise click.BadParameter(f"unknown society {society!r}; configured: {', '.join(societies)}",
+                                 param_hint="--society")
+    return [society]
+
+@click.command("create-db")
+@with_appcontext
+def create_db():
+    """Create missing tables and apply additive schema upgrades."""
+    pool = current_app.extensions.get('society_engines')
+    if pool is not None:
+        # One database per society: opening each creates and upgrades it
+        for society in selected_societies(None):
+            pool.get(society)
+            print(f"✅ [{society}] Database tables created/verified")
+    else:
         db.create_all()
+        upgraded = upgrade_schema(db.engine, db.metadata, current_app.config['DEFAULT_SOCIETY'])
+        if upgraded:
+            print(f"✅ Schema upgraded: {', '.join(upgraded)}")
+        print("✅ Database tables created/verified")
+
+    for society in selected_societies(None):
+        with tenancy.society_context(society):
+            ranked = dispatch.backfill_ranks()
+            db.session.commit()
+        if ranked:
+            print(f"✅ [{society}] Ranked {ranked} complaints for the dispatch queue")
+
+@click.command("seed")
+@society_option
+@with_appcontext
+def seed(society):
+    """Create the default admin and resident in each society that has no users."""
+    for name in selected_societies(society):
+        with tenancy.society_context(name):
+            seed_society(name)
+
+def seed_society(society):
+    if User.query.first():
+        print(f"[{society}] Users already exist, nothing to seed")
+        return
+    
+    print(f"📝 [{society}] Creating default users...")
+    
+    # Admin user
+    admin = User(
+        username='admin', 
+        password=hash_password('admin123'), 
+        role='admin', 
+        email='admin@society.com'
+    )
+    db.session.add(admin)
+    
+    # Resident user
+    resident = User(
+        username='john', 
+        password=hash_password('john123'), 
+        role='resident', 
+        email='john@example.com'
+    )
+    db.session.add(resident)
+    db.session.flush()
+    
+    # Member record
+    member = Member(
+        name='John Doe', 
+        flat_no='101', 
+        contact='9876543210', 
+        email='john@example.com', 
+        member_type='Owner'
+    )
+    db.session.add(member)
+    
+    db.session.commit()
+    print(f"✅ [{society}] Default users created successfully!")
+
+@click.command("rebuild-dispatch")
+@society_option
+@with_appcontext
+def rebuild_dispatch(society):
+    """Backfill complaint ranks/SLA deadlines and recompute staff load and SLA stats."""
+    for name in selected_societies(society):
+        with tenancy.society_context(name):
+            count = dispatch.rebuild()
+        print(f"✅ [{name}] Rebuilt dispatch data for {count} complaints")
+
+@click.command("rebuild-analytics")
+@society_option
+@with_appcontext
+def rebuild_analytics(society):
+    """Recompute the weekly complaint rollups from complaints and the archive."""
+    for name in selected_societies(society):
+        with tenancy.society_context(name):
+            count = analytics.rebuild()
+        print(f"✅ [{name}] Rebuilt complaint analytics from {count} complaints")
+
+@click.command("generate-documents")
+@click.argument("month", type=int)
+@click.argument("year", type=int)
+@click.option("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+@society_option
+@with_appcontext
+def generate_documents(month, year, workers, society):
+    """Render PDF bills and receipts for a billing period into the document cache."""
+    for name in selected_societies(society):
+        with tenancy.society_context(name):
+            rendered, cached = documents.generate_period(month, year, current_app.config['DOCUMENT_CACHE_DIR'],
+                                                         workers=workers)
+        print(f"✅ [{name}] Rendered {rendered} documents for {month}/{year} ({cached} already cached)")
+
+@click.command("outbox-drain")
+@click.option("--loop", is_flag=True, help="Keep draining until interrupted")
+@click.option("--interval", type=float, default=10.0, help="Seconds between passes with --loop")
+@with_appcontext
+def outbox_drain(loop, interval):
+    """Send pending notifications from the outbox."""
+    import time
+    
+    dispatcher = outbox.dispatcher_from_config(current_app)
+    try:
+        while True:
+            for society, (sent, failed) in outbox.drain_all(current_app, dispatcher).items():
+                if sent or failed:
+                    print(f"[{society}] sent {sent}, failed {failed}")
+            if not loop:
+                break
+            time.sleep(interval)
+    finally:
+        dispatcher.close()
+
+@click.command("archive")
+@click.option("--months", type=int, default=None, help="Archive paid bills and completed complaints older than this")
+@click.option("--dry-run", is_flag=True, help="Only count what would be archived")
+@with_appcontext
+def archive_history(months, dry_run):
+    """Move old paid bills and completed complaints into compressed archive batches."""
+    if months is None:
+        months = current_app.config['ARCHIVE_AFTER_MONTHS']
+    
+    totals = archive.archive_all(current_app, months, current_app.config['ARCHIVE_BATCH_SIZE'], dry_run)
+    verb = 'would archive' if dry_run else 'archived'
+    for society, counts in totals.items():
+        print(f"[{society}] {verb} {counts['bill']} bills, {counts['complaint']} complaints")
+
+@click.command("replica-sync")
+@with_appcontext
+def replica_sync():
+    """Copy the primary SQLite database onto the read replica (local testing)."""
+    if not current_app.config['SQLALCHEMY_READ_DATABASE_URI']:
+        print("SQLALCHEMY_READ_DATABASE_URI is not set")
+        return
+    replicas.sync(current_app)
+    print("Replica synced from primary")
+
+@click.command("backup")
+@click.option("--every", type=float, default=None, help="Keep taking a snapshot every N seconds")
+@with_appcontext
+def backup_databases(every):
+    """Take compressed online snapshots of the society database(s)."""
+    import time
+    
+    while True:
+        for path, seconds, size in backup.run(current_app):
+            print(f"{path} ({size / 1024:.0f} KB in {seconds:.2f}s)")
+        if every is None:
+            break
+        time.sleep(every)
+
+@click.command("backup-verify")
+@click.argument("path")
+@with_appcontext
+def verify_backup(path):
+    """Integrity-check a snapshot and list its row counts."""
+    ok, message, counts = backup.verify(path)
+    for table, count in counts.items():
+        print(f"  {table}: {count}")
+    print("OK" if ok else f"FAILED: {message}")
+    if not ok:
+        sys.exit(1)
+
+@click.command("restore")
+@click.argument("path")
+@click.option("--yes", is_flag=True, help="Don't ask for confirmation")
+@with_appcontext
+def restore_backup(path, yes):
+    """Restore a snapshot over the live database it was taken from."""
+    name = backup.snapshot_name(path)
+    targets = backup.database_files(current_app)
+    if current_app.config.get('SOCIETY_STORAGE') == 'per_tenant':
+        targets.setdefault(name, os.path.join(current_app.config['SOCIETY_DB_DIR'], f'{name}.db'))
+    if name not in targets:
+        print(f"No database named {name!r} to restore into")
+        sys.exit(1)
+    if not yes:
+        click.confirm(f"Overwrite {targets[name]} with {path}?", abort=True)
+    
+    counts = backup.restore(path, targets[name])
+    print(f"Restored {sum(counts.values())} rows across {len(counts)} tables into {targets[name]}")
+
+@click.command("assets-build")
+@with_appcontext
+def build_assets():
+    """Fingerprint and precompress static files; run in the build phase so containers start without it."""
+    manifest = assets.build(current_app.static_folder, current_app.config['ASSETS_DIR'])
+    print(f"Built {len(manifest)} assets into {current_app.config['ASSETS_DIR']}")
+
+@click.command("init-db")
+@with_appcontext
+def init_db():
+    # Drop all tables
+    db.drop_all()
+    db.create_all()
+    
+    # Create admin user
+    admin = User(username='admin', password=hash_password('admin123'), role='admin', email='admin@society.com')
+    db.session.add(admin)
+    
+    # Create sample resident
+    resident = User(username='john', password=hash_password('john123'), role='resident', email='john@example.com')
+    db.session.add(resident)
+    
+    # Create second resident
+    resident2 = User(username='jane', password=hash_password('jane123'), role='resident', email='jane@example.com')
+    db.session.add(resident2)
+    
+    # Add sample members
+    member1 = Member(
+        name='John Doe', 
+        flat_no='101', 
+        contact='9876543210', 
+        email='john@example.com', 
+        member_type='Owner'
+    )
+    db.session.add(member1)
+    
+    member2 = Member(
+        name='Jane Smith', 
+        flat_no='202', 
+        contact='9876543211', 
+        email='jane@example.com', 
+        member_type='Tenant'
+    )
+    db.session.add(member2)
+    
+    # Flush to get member IDs
+    db.session.flush()
+    
+    # Add sample complaints
+    complaint1 = Complaint(
+        description='Water leakage in bathroom',
+        member_id=member1.id,
+        category='Plumbing',
+        priority='High',
+        status='Pending'
+    )
+    dispatch.on_created(complaint1)
+    analytics.on_created(complaint1)
+    db.session.add(complaint1)
+    
+    complaint2 = Complaint(
+        description='Lift not working properly',
+        member_id=member2.id,
+        category='Electrical',
+        priority='Urgent',
+        status='In Progress'
+    )
+    dispatch.on_created(complaint2)
+    analytics.on_created(complaint2)
+    db.session.add(complaint2)
+    
+    # Add sample notice
+    notice = Notice(
+        title='Welcome to Society', 
+        content='Welcome to our society management system. Please pay your maintenance bills by 10th of every month.',
+        posted_by=admin.id
+    )
+    db.session.add(notice)
+    
+    # Generate sample bills for last 3 months
+    current_date = datetime.now()
+    for i in range(3):
+        bill_date = current_date - relativedelta(months=i)
+        month = bill_date.month
+        year = bill_date.year
         
-        # Create admin user
-        admin = User(username='admin', password='admin123', role='admin', email='admin@society.com')
-        db.session.add(admin)
-        
-        # Create sample resident
-        resident = User(username='john', password='john123', role='resident', email='john@example.com')
-        db.session.add(resident)
-        
-        # Create second resident
-        resident2 = User(username='jane', password='jane123', role='resident', email='jane@example.com')
-        db.session.add(resident2)
-        
-        # Add sample members
-        member1 = Member(
-            name='John Doe', 
-            flat_no='101', 
-            contact='9876543210', 
-            email='john@example.com', 
-            member_type='Owner'
-        )
-        db.session.add(member1)
-        
-        member2 = Member(
-            name='Jane Smith', 
-            flat_no='202', 
-            contact='9876543211', 
-            email='jane@example.com', 
-            member_type='Tenant'
-        )
-        db.session.add(member2)
-        
-        # Flush to get member IDs
-        db.session.flush()
+        # Calculate due date (10th of next month)
+        if month == 12:
+            due_date = date(year + 1, 1, 10)
+            paid_date = date(year + 1, 1, 5) if i > 0 else None
+        else:
+            due_date = date(year, month + 1, 10)
+            paid_date = date(year, month + 1, 5) if i > 0 else None
         
-        # Add sample complaints
-        complaint1 = Complaint(
-            description='Water leakage in bathroom',
+        # Bill for member 1 (John)
+        bill1 = MaintenanceBill(
             member_id=member1.id,
-            category='Plumbing',
-            priority='High',
-            status='Pending'
-        )
-        db.session.add(complaint1)
-        
-        complaint2 = Complaint(
-            description='Lift not working properly',
-            member_id=member2.id,
-            category='Electrical',
-            priority='Urgent',
-            status='In Progress'
-        )
-        db.session.add(complaint2)
-        
-        # Add sample notice
-        notice = Notice(
-            title='Welcome to Society', 
-            content='Welcome to our society management system. Please pay your maintenance bills by 10th of every month.',
-            posted_by=admin.id
+            bill_number=f"BILL/{year}/{month}/101/{1000 + i}",
+            month=month,
+            year=year,
+            maintenance_amount=1000.00,
+            sinking_fund=200.00,
+            parking_fee=100.00,
+            water_charges=150.00,
+            electricity_charges=300.00,
+            garbage_fee=50.00,
+            late_fee=0.0,
+            discount=0.0,
+            due_date=due_date,
+            status='Paid' if i > 0 else 'Unpaid',
+            paid_date=paid_date,
+            payment_method='Online' if i > 0 else None,
+            transaction_id=f'TXN{year}{month}{member1.id}{i}' if i > 0 else None
         )
-        db.session.add(notice)
-        
-        # Generate sample bills for last 3 months
-        current_date = datetime.now()
-        for i in range(3):
-            bill_date = current_date - relativedelta(months=i)
-            month = bill_date.month
-            year = bill_date.year
-            
-            # Calculate due date (10th of next month)
-            if month == 12:
-                due_date = date(year + 1, 1, 10)
-                paid_date = date(year + 1, 1, 5) if i > 0 else None
-            else:
-                due_date = date(year, month + 1, 10)
-                paid_date = date(year, month + 1, 5) if i > 0 else None
-            
-            # Bill for member 1 (John)
-            bill1 = MaintenanceBill(
-                member_id=member1.id,
-                bill_number=f"BILL/{year}/{month}/101/{1000 + i}",
-                month=month,
-                year=year,
-                maintenance_amount=1000.00,
-                sinking_fund=200.00,
-                parking_fee=100.00,
-                water_charges=150.00,
-                electricity_charges=300.00,
-                garbage_fee=50.00,
-                late_fee=0.0,
-                discount=0.0,
-                due_date=due_date,
-                status='Paid' if i > 0 else 'Unpaid',
-                paid_date=paid_date,
-                payment_method='Online' if i > 0 else None,
-                transaction_id=f'TXN{year}{month}{member1.id}{i}' if i > 0 else None
-            )
-            bill1.calculate_totals()
-            db.session.add(bill1)
-            
-            # Calculate due date for member 2
-            if month == 12:
-                due_date2 = date(year + 1, 1, 10)
-                paid_date2 = date(year + 1, 1, 3) if i < 2 else None
-            else:
-                due_date2 = date(year, month + 1, 10)
-                paid_date2 = date(year, month + 1, 3) if i < 2 else None
-            
-            # Bill for member 2 (Jane)
-            bill2 = MaintenanceBill(
-                member_id=member2.id,
-                bill_number=f"BILL/{year}/{month}/202/{2000 + i}",
-                month=month,
-                year=year,
-                maintenance_amount=1000.00,
-                sinking_fund=200.00,
-                parking_fee=0.00,
-                water_charges=150.00,
-                electricity_charges=300.00,
-                garbage_fee=50.00,
-                late_fee=0.0,
-                discount=0.0,
-                due_date=due_date2,
-                status='Paid' if i < 2 else 'Unpaid',
-                paid_date=paid_date2,
-                payment_method='Cash' if i < 2 else None,
-                transaction_id=f'TXN{year}{month}{member2.id}{i}' if i < 2 else None
-            )
-            bill2.calculate_totals()
-            db.session.add(bill2)
-        
-        # Add an overdue bill for testing
-        last_month = current_date - relativedelta(months=1)
-        month = last_month.month
-        year = last_month.year
+        bill1.calculate_totals()
+        db.session.add(bill1)
         
+        # Calculate due date for member 2
         if month == 12:
-            overdue_due_date = date(year + 1, 1, 10)
+            due_date2 = date(year + 1, 1, 10)
+            paid_date2 = date(year + 1, 1, 3) if i < 2 else None
         else:
-            overdue_due_date = date(year, month + 1, 10)
+            due_date2 = date(year, month + 1, 10)
+            paid_date2 = date(year, month + 1, 3) if i < 2 else None
         
-        overdue_bill = MaintenanceBill(
-            member_id=member1.id,
-            bill_number=f"BILL/{year}/{month}/101/OVERDUE",
+        # Bill for member 2 (Jane)
+        bill2 = MaintenanceBill(
+            member_id=member2.id,
+            bill_number=f"BILL/{year}/{month}/202/{2000 + i}",
             month=month,
             year=year,
             maintenance_amount=1000.00,
             sinking_fund=200.00,
-            parking_fee=100.00,
+            parking_fee=0.00,
             water_charges=150.00,
             electricity_charges=300.00,
             garbage_fee=50.00,
-            late_fee=100.00,
+            late_fee=0.0,
             discount=0.0,
-            due_date=overdue_due_date,
-            status='Overdue',
-            paid_date=None,
-            payment_method=None,
-            transaction_id=None
+            due_date=due_date2,
+            status='Paid' if i < 2 else 'Unpaid',
+            paid_date=paid_date2,
+            payment_method='Cash' if i < 2 else None,
+            transaction_id=f'TXN{year}{month}{member2.id}{i}' if i < 2 else None
         )
-        overdue_bill.calculate_totals()
-        db.session.add(overdue_bill)
-        
-        db.session.commit()
-        print("=" * 60)
-        print("DATABASE INITIALIZED WITH SAMPLE DATA!")
-        print("=" * 60)
-        print("Admin Login: admin / admin123")
-        print("Resident Logins:")
-        print("  - John: john / john123 (Flat 101, Owner)")
-        print("  - Jane: jane / jane123 (Flat 202, Tenant)")
-        print("=" * 60)
-        print("\nBilling Sample Data:")
-        print("✅ Paid bills for previous months")
-        print("✅ Unpaid bill for current month")
-        print("✅ Overdue bill for testing late fees")
-        print("=" * 60)
+        bill2.calculate_totals()
+        db.session.add(bill2)
+    
+    # Add an overdue bill for testing
+    last_month = current_date - relativedelta(months=1)
+    month = last_month.month
+    year = last_month.year
+    
+    if month == 12:
+        overdue_due_date = date(year + 1, 1, 10)
+    else:
+        overdue_due_date = date(year, month + 1, 10)
+    
+    overdue_bill = MaintenanceBill(
+        member_id=member1.id,
+        bill_number=f"BILL/{year}/{month}/101/OVERDUE",
+        month=month,
+        year=year,
+        maintenance_amount=1000.00,
+        sinking_fund=200.00,
+        parking_fee=100.00,
+        water_charges=150.00,
+        electricity_charges=300.00,
+        garbage_fee=50.00,
+        late_fee=100.00,
+        discount=0.0,
+        due_date=overdue_due_date,
+        status='Overdue',
+        paid_date=None,
+        payment_method=None,
+        transaction_id=None
+    )
+    overdue_bill.calculate_totals()
+    db.session.add(overdue_bill)
+    
+    db.session.commit()
+    print("=" * 60)
+    print("DATABASE INITIALIZED WITH SAMPLE DATA!")
+    print("=" * 60)
+    print("Admin Login: admin / admin123")
+    print("Resident Logins:")
+    print("  - John: john / john123 (Flat 101, Owner)")
+    print("  - Jane: jane / jane123 (Flat 202, Tenant)")
+    print("=" * 60)
+    print("\nBilling Sample Data:")
+    print("✅ Paid bills for previous months")
+    print("✅ Unpaid bill for current month")
+    print("✅ Overdue bill for testing late fees")
+    print("=" * 60)
+
+app = create_app(os.environ.get('FLASK_CONFIG', 'default'))
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port)
@@ -2,20 +2,38 @@ from extensions import db
 from flask_login import UserMixin
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
+from tenancy import current_society, DEFAULT_SOCIETY
 
-class User(UserMixin, db.Model):
+
+class TenantMixin:
+    """Rows owned by one society; queries are filtered to the current society automatically"""
+    society_id = db.Column(db.String(50), nullable=False, default=current_society,
+                           server_default=DEFAULT_SOCIETY)
+
+class User(UserMixin, TenantMixin, db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('society_id', 'username'),
+        db.UniqueConstraint('society_id', 'email'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(50), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
+    username = db.Column(db.String(50), nullable=False)
+    password = db.Column(db.String(255), nullable=False)  # werkzeug scrypt/pbkdf2 hash
     role = db.Column(db.String(20), nullable=False)  # 'admin' or 'resident'
-    email = db.Column(db.String(100), unique=True)
+    email = db.Column(db.String(100))
 
-class Member(db.Model):
+    def get_id(self):
+        # Qualified with the society, since ids repeat across per-society databases
+        return f'{self.society_id}:{self.id}'
+
+class Member(TenantMixin, db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('society_id', 'email'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     flat_no = db.Column(db.String(10), nullable=False)
     contact = db.Column(db.String(15))
-    email = db.Column(db.String(100), unique=True)
+    email = db.Column(db.String(100))
     member_type = db.Column(db.String(20))  # 'Owner' or 'Tenant'
     join_date = db.Column(db.DateTime, default=datetime.now)
     
@@ -23,8 +41,15 @@ class Member(db.Model):
     bills = db.relationship('MaintenanceBill', backref='member', lazy=True)
 
 
-class Complaint(db.Model):
+class Complaint(TenantMixin, db.Model):
     __tablename__ = 'complaint'
+    __table_args__ = (
+        db.Index('ix_complaint_society_date', 'society_id', 'date_requested'),
+        db.Index('ix_complaint_society_member', 'society_id', 'member_id'),
+        # Dispatch queue (open complaints by priority, then age) and SLA breach lookups
+        db.Index('ix_complaint_queue', 'society_id', 'status', 'priority_rank', 'date_requested'),
+        db.Index('ix_complaint_sla', 'society_id', 'status', 'sla_due'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.Text, nullable=False)
     member_id = db.Column(db.Integer, db.ForeignKey('member.id'), nullable=False)
@@ -35,12 +60,80 @@ class Complaint(db.Model):
     assigned_to = db.Column(db.String(100))
     resolved_date = db.Column(db.DateTime)
     remarks = db.Column(db.Text)
+    
+    # Dispatch and SLA tracking, maintained by dispatch.py
+    staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'))
+    priority_rank = db.Column(db.Integer)  # 0 = Urgent ... 3 = Low
+    sla_due = db.Column(db.DateTime)
+    resolve_seconds = db.Column(db.Integer)
+    sla_breached = db.Column(db.Boolean)
+    
+    # Optimistic concurrency: bumped on every UPDATE, which is issued with WHERE version = <read value>
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
+
+class Staff(TenantMixin, db.Model):
+    """Maintenance staff that complaints are auto-assigned to"""
+    __table_args__ = (
+        db.Index('ix_staff_dispatch', 'society_id', 'category', 'active', 'open_count'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    category = db.Column(db.String(50), nullable=False, default='General')
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    open_count = db.Column(db.Integer, nullable=False, default=0)  # currently assigned open complaints
+    
+    complaints = db.relationship('Complaint', backref='staff', lazy=True)
+
+class ComplaintSlaStats(TenantMixin, db.Model):
+    """Running resolution totals per category, updated as complaints are completed"""
+    __tablename__ = 'complaint_sla_stats'
+    __table_args__ = (
+        db.UniqueConstraint('society_id', 'category'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False)
+    resolved_count = db.Column(db.Integer, nullable=False, default=0)
+    resolve_seconds_total = db.Column(db.Integer, nullable=False, default=0)
+    breached_count = db.Column(db.Integer, nullable=False, default=0)
+
+class ComplaintWeeklyStats(TenantMixin, db.Model):
+    """Weekly complaint counts per category, maintained incrementally by analytics.py"""
+    __tablename__ = 'complaint_weekly_stats'
+    __table_args__ = (
+        db.UniqueConstraint('society_id', 'week', 'category', name='uq_complaint_weekly'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    week = db.Column(db.Date, nullable=False)  # Monday
+    category = db.Column(db.String(50), nullable=False)
+    created_count = db.Column(db.Integer, nullable=False, default=0)
+    resolved_count = db.Column(db.Integer, nullable=False, default=0)  # by week of resolution
+    resolve_seconds_total = db.Column(db.Integer, nullable=False, default=0)
+    withdrawn_count = db.Column(db.Integer, nullable=False, default=0)  # open complaints deleted that week
+
+class ComplaintResolveHistogram(TenantMixin, db.Model):
+    """Time-to-resolve histogram per resolution week and category, for percentiles (see analytics.RESOLVE_BUCKET_HOURS)"""
+    __tablename__ = 'complaint_resolve_histogram'
+    __table_args__ = (
+        db.UniqueConstraint('society_id', 'week', 'category', 'bucket', name='uq_complaint_resolve_histogram'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    week = db.Column(db.Date, nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    bucket = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
 
-class MaintenanceBill(db.Model):
+class MaintenanceBill(TenantMixin, db.Model):
     __tablename__ = 'maintenance_bill'
+    __table_args__ = (
+        db.UniqueConstraint('society_id', 'bill_number'),
+        # Covers the receivables aging query (status filter, due-date buckets, per-member totals)
+        db.Index('ix_bill_society_status_due', 'society_id', 'status', 'due_date', 'member_id', 'total_amount'),
+        db.Index('ix_bill_society_member_period', 'society_id', 'member_id', 'year', 'month'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     member_id = db.Column(db.Integer, db.ForeignKey('member.id'), nullable=False)
-    bill_number = db.Column(db.String(50), unique=True, nullable=False)
+    bill_number = db.Column(db.String(50), nullable=False)
     month = db.Column(db.Integer, nullable=False)  # 1-12
     year = db.Column(db.Integer, nullable=False)
     
@@ -68,6 +161,10 @@ class MaintenanceBill(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.now)
     
+    # Optimistic concurrency, see Complaint.version
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
+    
     def calculate_totals(self):
         # Ensure all values are floats (not None)
         self.maintenance_amount = float(self.maintenance_amount or 0.0)
@@ -90,6 +187,75 @@ class MaintenanceBill(db.Model):
             if self.late_fee == 0:
                 self.late_fee = 100.00  # Standard late fee
                 self.calculate_totals()
+
+
+class OutboxMessage(TenantMixin, db.Model):
+    """Notification written in the same transaction as the event; sent later by outbox.py"""
+    __tablename__ = 'outbox_message'
+    __table_args__ = (
+        db.Index('ix_outbox_due', 'society_id', 'status', 'next_attempt_at'),
+        db.Index('ix_outbox_claim', 'claim'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False, default='email')
+    event = db.Column(db.String(50), nullable=False)  # 'bill_created', 'late_fee', 'complaint_status'
+    recipient = db.Column(db.String(200), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    claim = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    sent_at = db.Column(db.DateTime)
+
+class ArchiveBatch(TenantMixin, db.Model):
+    """Paid bills or completed complaints moved out of the hot tables by archive.py, zlib-compressed JSON"""
+    __tablename__ = 'archive_batch'
+    __table_args__ = (
+        db.Index('ix_archive_kind_period', 'society_id', 'kind', 'period'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'bill' or 'complaint'
+    period = db.Column(db.String(7), nullable=False)  # 'YYYY-MM' billing period / resolution month
+    row_count = db.Column(db.Integer, nullable=False)
+    amount_total = db.Column(db.Float, nullable=False, default=0.0)  # sum of bill totals, so stats need no decompression
+    payload = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    members = db.relationship('ArchiveBatchMember', lazy=True, cascade='all, delete-orphan')
+
+
+class ArchiveBatchMember(db.Model):
+    """Members with rows in an archive batch, so one member's history only decompresses their batches"""
+    __tablename__ = 'archive_batch_member'
+    __table_args__ = (
+        db.Index('ix_archive_member', 'member_id', 'batch_id'),
+    )
+    batch_id = db.Column(db.Integer, db.ForeignKey('archive_batch.id'), primary_key=True)
+    member_id = db.Column(db.Integer, primary_key=True)
+
+class AuditEvent(TenantMixin, db.Model):
+    """Append-only record of who did what; written in batches by audit.py, never updated or deleted"""
+    __tablename__ = 'audit_event'
+    __table_args__ = (
+        db.Index('ix_audit_society_time', 'society_id', 'created_at'),
+        db.Index('ix_audit_entity', 'society_id', 'entity', 'entity_id'),
+        db.Index('ix_audit_action_time', 'society_id', 'action', 'created_at'),
+        db.Index('ix_audit_actor_time', 'society_id', 'actor', 'created_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)  # when the action happened, not when it was written
+    actor_id = db.Column(db.Integer)
+    actor = db.Column(db.String(50))  # username at the time, kept if the user is deleted later
+    action = db.Column(db.String(50), nullable=False)  # 'bill.paid', 'complaint.status', 'member.deleted', ...
+    entity = db.Column(db.String(20), nullable=False)  # 'bill', 'complaint', 'member', 'notice'
+    entity_id = db.Column(db.Integer)
+    summary = db.Column(db.String(255))
+    details = db.Column(db.Text)  # JSON
+    ip = db.Column(db.String(45))
+
 class MaintenanceSetting(db.Model):
     """Global maintenance settings"""
     id = db.Column(db.Integer, primary_key=True)
@@ -106,7 +272,10 @@ class Payment(db.Model):
     transaction_id = db.Column(db.String(100))
     remarks = db.Column(db.Text)
 
-class Notice(db.Model):
+class Notice(TenantMixin, db.Model):
+    __table_args__ = (
+        db.Index('ix_notice_society_date', 'society_id', 'date_posted'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -0,0 +1,184 @@
+# passwords.py
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from extensions import db
+import threading
+import hashlib
+import hmac
+import time
+import os
+
+HASH_PREFIXES = ('scrypt:', 'pbkdf2:')
+
+
+class HasherBusy(Exception):
+    """Raised when too many hash/verify jobs are already queued"""
+
+
+def is_hashed(stored):
+    return stored.startswith(HASH_PREFIXES) and stored.count('$') == 2
+
+
+def hash_method(stored):
+    return stored.split('$', 1)[0]
+
+
+def expand_method(method):
+    """
+    The method string werkzeug writes into hashes made with `method`: stored
+    hashes carry the full parameters ('scrypt:32768:8:1') even when the
+    configured method is a short name ('scrypt').
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        args = ['32768', '8', '1']
+    elif name == 'pbkdf2' and len(args) < 2:
+        args = (args or ['sha256']) + [str(DEFAULT_PBKDF2_ITERATIONS)]
+    return ':'.join([name] + args)
+
+
+class PasswordHasher:
+    """
+    Password hashing with a configurable work factor.
+
+    Hashing and verification run on a small bounded thread pool (scrypt and
+    pbkdf2 release the GIL), so a login spike queues up behind a fixed number
+    of CPU-bound jobs instead of pinning every worker thread. Jobs beyond the
+    queue limit are refused with HasherBusy.
+
+    Successful verifications are remembered for a short time as an HMAC of the
+    password under a per-process key, so repeat logins skip the slow hash.
+    """
+
+    def __init__(self, method, workers=2, max_pending=32, queue_timeout=5.0,
+                 cache_ttl=300, cache_size=10000):
+        self.method = method
+        self.queue_timeout = queue_timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.workers = workers
+        self._pool = None  # started on first use, so importing the app stays cheap
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_key = os.urandom(32)
+        self._dummy = None  # made on first use, hashing is slow by design
+        self._dummy_lock = threading.Lock()
+        self.full_method = expand_method(method)
+
+    def _executor(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        return self._pool
+
+    def _run(self, fn, *args, **kwargs):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusy()
+        try:
+            future = self._executor().submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, method=self.method)
+
+    def verify(self, stored, password):
+        """Returns (matches, needs_rehash)."""
+        if not is_hashed(stored):
+            # Legacy plaintext row: upgrade it as soon as the user logs in
+            matches = hmac.compare_digest(stored.encode(), password.encode())
+            return matches, matches
+
+        needs_rehash = hash_method(stored) != self.full_method
+        if self._cache_hit(stored, password):
+            return True, needs_rehash
+
+        matches = self._run(check_password_hash, stored, password)
+        if matches:
+            self._cache_store(stored, password)
+        return matches, matches and needs_rehash
+
+    def verify_dummy(self, password):
+        """Spend the same time as a real verify, used when the username does not exist."""
+        if self._dummy is None:
+            with self._dummy_lock:
+                if self._dummy is None:
+                    self._dummy = self.hash(os.urandom(16).hex())
+        self._run(check_password_hash, self._dummy, password)
+
+    # ----- verification cache -----
+    def _digest(self, stored, password):
+        return hmac.new(self._cache_key, f'{stored}\0{password}'.encode(), hashlib.sha256).digest()
+
+    def _cache_hit(self, stored, password):
+        if not self.cache_ttl:
+            return False
+        with self._cache_lock:
+            entry = self._cache.get(stored)
+        if entry is None:
+            return False
+        digest, expires = entry
+        if expires < time.monotonic():
+            with self._cache_lock:
+                self._cache.pop(stored, None)
+            return False
+        return hmac.compare_digest(digest, self._digest(stored, password))
+
+    def _cache_store(self, stored, password):
+        if not self.cache_ttl:
+            return
+        entry = (self._digest(stored, password), time.monotonic() + self.cache_ttl)
+        with self._cache_lock:
+            self._cache[stored] = entry
+            self._cache.move_to_end(stored)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+
+def init_app(app):
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+    app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 32)
+    app.config.setdefault('PASSWORD_CACHE_TTL', 300)
+
+    app.extensions['passwords'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        cache_ttl=app.config['PASSWORD_CACHE_TTL']
+    )
+
+
+def hash_password(password):
+    return current_app.extensions['passwords'].hash(password)
+
+
+def check_login(user, password):
+    """
+    Verify a login attempt, upgrading plaintext or old-cost hashes on success.
+    Raises HasherBusy when the hashing pool is saturated.
+    """
+    hasher = current_app.extensions['passwords']
+    password = password or ''
+
+    if user is None:
+        hasher.verify_dummy(password)
+        return False
+
+    matches, needs_rehash = hasher.verify(user.password, password)
+    if matches and needs_rehash:
+        user.password = hasher.hash(password)
+        db.session.commit()
+    return matches
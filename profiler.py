@@ -0,0 +1,182 @@
+# profiler.py
+from flask import g, request
+from flask_login import current_user
+from collections import Counter
+from datetime import datetime
+import threading
+import logging
+import random
+import time
+import sys
+import os
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('db', 'orm', 'template', 'python')
+
+
+# ===== SAMPLER =====
+def _frame_label(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.endswith('.html') or filename.endswith('.txt'):
+        return f'template:{os.path.basename(filename)}'
+    return f'{os.path.basename(filename)}:{getattr(code, "co_qualname", code.co_name)}'
+
+
+def _phase(frame):
+    """
+    Innermost framework that owns the sample: SQLAlchemy's engine/driver layer
+    ('db'), the rest of SQLAlchemy ('orm'), Jinja ('template') or plain Python.
+    A lazy load fired from a template counts as db/orm, not template.
+    """
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.sep + 'sqlalchemy' + os.sep in filename:
+            for layer in ('engine', 'dialects', 'pool'):
+                if os.sep + layer + os.sep in filename:
+                    return 'db'
+            return 'orm'
+        if os.sep + 'jinja2' + os.sep in filename or filename.endswith('.html'):
+            return 'template'
+        frame = frame.f_back
+    return 'python'
+
+
+class Profile:
+    """Stack samples of one request."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.stacks = Counter()
+        self.phases = Counter()
+
+    def add(self, frame):
+        self.phases[_phase(frame)] += 1
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(labels))] += 1
+
+    def breakdown(self):
+        """{phase: milliseconds}, wall time shared out by sample counts."""
+        total = sum(self.phases.values())
+        elapsed = (time.perf_counter() - self.started) * 1000
+        return {phase: elapsed * self.phases[phase] / total if total else 0.0 for phase in PHASES}
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format, for flamegraph.pl or speedscope."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class Sampler:
+    """
+    One background thread that, while any request is being profiled, reads
+    the profiled threads' current frames every `interval` seconds. Requests
+    that are not profiled pay nothing.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+
+    def start(self, profile):
+        with self._lock:
+            self._active[threading.get_ident()] = profile
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def stop(self):
+        with self._lock:
+            return self._active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._active:
+                    self._wake.wait()
+                active = dict(self._active)
+            frames = sys._current_frames()
+            for ident, profile in active.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    profile.add(frame)
+            del frames
+            time.sleep(self.interval)
+
+
+# ===== FLASK HOOKS =====
+def _wanted(app):
+    header = request.headers.get(app.config['PROFILE_HEADER'])
+    if header and current_user.is_authenticated and current_user.role == 'admin':
+        return True
+    rate = app.config['PROFILE_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def _write(app, profile):
+    directory = app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    path = os.path.join(directory, f'{stamp}-{profile.name}.folded')
+    with open(path, 'w') as f:
+        f.write(profile.collapsed())
+    return path
+
+
+def init_app(app):
+    """
+    Opt-in request profiling. A PROFILE_SAMPLE_RATE fraction of requests, plus
+    any admin request carrying the PROFILE_HEADER header, is sampled. Its
+    collapsed stacks go to PROFILE_DIR and its DB/ORM/template/Python split
+    to a Server-Timing header and the log.
+    """
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_HEADER', 'X-Profile')
+    app.config.setdefault('PROFILE_INTERVAL', 0.005)
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+
+    sampler = Sampler(app.config['PROFILE_INTERVAL'])
+    app.extensions['profiler'] = sampler
+
+    @app.before_request
+    def start_profile():
+        if request.endpoint in (None, 'static') or not _wanted(app):
+            return
+        g.profile = Profile(request.endpoint)
+        sampler.start(g.profile)
+
+    @app.after_request
+    def report_profile(response):
+        # Streamed pages are still rendering here; they are finished in teardown instead
+        if 'profile' not in g or response.is_streamed:
+            return response
+        breakdown = _finish(app, g.pop('profile'))
+        response.headers['Server-Timing'] = ', '.join(
+            f'{phase};dur={ms:.1f}' for phase, ms in breakdown.items())
+        return response
+
+    @app.teardown_request
+    def finish_streamed_profile(exc):
+        # Runs once a streamed body has been sent, or after a request that failed
+        if 'profile' in g:
+            _finish(app, g.pop('profile'))
+
+    def _finish(app, profile):
+        sampler.stop()
+        breakdown = profile.breakdown()
+        try:
+            path = _write(app, profile)
+        except OSError:
+            logger.exception('Could not write request profile')
+            return breakdown
+        logger.info('Profiled %s %s: %s -> %s', request.method, request.path,
+                    ' '.join(f'{phase}={ms:.1f}ms' for phase, ms in breakdown.items()), path)
+        return breakdown
@@ -0,0 +1,173 @@
+# ratelimit.py
+from flask import request, current_app
+from werkzeug.exceptions import TooManyRequests
+from tenancy import current_society
+from functools import wraps
+from collections import defaultdict
+import threading
+import sqlite3
+import heapq
+import time
+import os
+
+
+# ===== BUCKET STORES =====
+class MemoryStore:
+    """
+    Token buckets for a single process.
+
+    Each key holds a single float: the time at which its bucket will be full
+    again. The current token count is derived from it, and once that time
+    has passed the key can be dropped, since a full bucket is the same as
+    no bucket at all.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._full_at = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, capacity, cost=1.0):
+        now = time.monotonic()
+        with self._lock:
+            full_at = self._full_at.get(key, now)
+            tokens = capacity - max(0.0, full_at - now) * rate
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+                self._full_at[key] = now + (capacity - tokens) / rate
+                if len(self._full_at) > self.max_keys:
+                    self._compact(now)
+        return allowed, tokens
+
+    def _compact(self, now):
+        """
+        Drop full buckets, then, if that did not free a tenth of max_keys, the
+        buckets closest to full as well, so the next rebuild is max_keys // 10
+        inserts away rather than one.
+        """
+        keep = self.max_keys - self.max_keys // 10
+        live = [(k, t) for k, t in self._full_at.items() if t > now]
+        if len(live) > keep:
+            live = heapq.nlargest(keep, live, key=lambda item: item[1])
+        self._full_at = dict(live)
+
+
+class SqliteStore:
+    """
+    Token buckets shared by every worker process on one host, kept in a small
+    SQLite file. Each consume is one short IMMEDIATE transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        # Opened per thread on first use rather than at app start-up
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_bucket ('
+                         'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key, rate, capacity, cost=1.0):
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_bucket WHERE key = ?', (key,)).fetchone()
+            tokens, last = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - last) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute('INSERT OR REPLACE INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+
+def make_store(uri):
+    if uri.startswith('sqlite:///'):
+        return SqliteStore(uri[len('sqlite:///'):])
+    return MemoryStore()
+
+
+# ===== LIMITER =====
+class RateLimiter:
+    """
+    Per-IP and per-username token buckets applied to individual routes.
+
+    Rules are configured in RATELIMIT_RULES as
+    {rule: {'ip': (requests, seconds), 'username': (requests, seconds)}};
+    the bucket size is the request count, refilled evenly over the period.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        self.counters = defaultdict(lambda: defaultdict(int))
+        self._counter_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_STORAGE', 'memory')  # or 'sqlite:////path/to/ratelimit.db'
+        app.config.setdefault('RATELIMIT_TRUST_PROXY', False)
+        app.config.setdefault('RATELIMIT_RULES', {
+            'login': {'ip': (20, 60), 'username': (5, 60)},
+            'complaint': {'ip': (10, 60)},
+            'billing': {'ip': (30, 60)},
+        })
+        self.store = make_store(app.config['RATELIMIT_STORAGE'])
+        app.extensions['ratelimit'] = self
+
+    def client_ip(self):
+        if current_app.config['RATELIMIT_TRUST_PROXY'] and request.access_route:
+            return request.access_route[0]
+        return request.remote_addr or 'unknown'
+
+    def check(self, rule):
+        """Consume one token from every bucket the rule defines; raise 429 if any is empty."""
+        limits = current_app.config['RATELIMIT_RULES'].get(rule, {})
+        keys = []
+        if 'ip' in limits:
+            keys.append(('ip', f'{rule}:ip:{self.client_ip()}', limits['ip']))
+        if 'username' in limits:
+            username = (request.form.get('username') or '').strip().lower()
+            if username:
+                keys.append(('username', f'{rule}:user:{current_society()}:{username}', limits['username']))
+
+        for scope, key, (count, seconds) in keys:
+            allowed, _ = self.store.consume(key, count / seconds, count)
+            if not allowed:
+                self._count(rule, f'limited_{scope}')
+                raise TooManyRequests(retry_after=max(1, int(seconds / count)))
+        self._count(rule, 'allowed')
+
+    def _count(self, rule, outcome):
+        with self._counter_lock:
+            self.counters[rule][outcome] += 1
+
+    def stats(self):
+        with self._counter_lock:
+            return {key: dict(value) for key, value in self.counters.items()}
+
+    def limit(self, rule, methods=('POST',)):
+        """Route decorator; only requests with one of `methods` are counted."""
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if current_app.config['RATELIMIT_ENABLED'] and request.method in methods:
+                    self.check(rule)
+                return view(*args, **kwargs)
+            return wrapped
+        return decorator
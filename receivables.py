@@ -0,0 +1,89 @@
+# receivables.py
+from extensions import db
+from models import Member, MaintenanceBill
+from datetime import date, timedelta
+import heapq
+
+# Aging buckets, in days past the bill's due date
+AGING_BUCKETS = ['0-30', '31-60', '61-90', '90+']
+OUTSTANDING_STATUSES = ['Unpaid', 'Overdue']
+
+
+def _bucket_columns(as_of):
+    """One SUM(CASE ...) column per aging bucket, keyed off the due date."""
+    cutoff_30 = as_of - timedelta(days=30)
+    cutoff_60 = as_of - timedelta(days=60)
+    cutoff_90 = as_of - timedelta(days=90)
+    due = MaintenanceBill.due_date
+    amount = MaintenanceBill.total_amount
+
+    return [
+        db.func.sum(db.case((due >= cutoff_30, amount), else_=0.0)),
+        db.func.sum(db.case(((due < cutoff_30) & (due >= cutoff_60), amount), else_=0.0)),
+        db.func.sum(db.case(((due < cutoff_60) & (due >= cutoff_90), amount), else_=0.0)),
+        db.func.sum(db.case((due < cutoff_90, amount), else_=0.0)),
+    ]
+
+
+def compute_aging(as_of=None, top_k=10):
+    """
+    Receivables aging over every Unpaid/Overdue bill.
+
+    Runs a single grouped query (one row per member) and builds the
+    society totals and the top-K defaulter ranking from that one pass.
+    Bills that are not yet due are counted in the 0-30 bucket.
+    """
+    as_of = as_of or date.today()
+
+    rows = db.session.query(
+        MaintenanceBill.member_id,
+        db.func.count(MaintenanceBill.id),
+        db.func.sum(MaintenanceBill.total_amount),
+        db.func.min(MaintenanceBill.due_date),
+        *_bucket_columns(as_of)
+    ).filter(
+        MaintenanceBill.status.in_(OUTSTANDING_STATUSES)
+    ).group_by(MaintenanceBill.member_id)
+
+    totals = dict.fromkeys(AGING_BUCKETS, 0.0)
+    total_outstanding = 0.0
+    bill_count = 0
+    members = []
+
+    for member_id, count, outstanding, oldest_due, *buckets in rows:
+        buckets = [float(b or 0.0) for b in buckets]
+        for name, amount in zip(AGING_BUCKETS, buckets):
+            totals[name] += amount
+        total_outstanding += outstanding or 0.0
+        bill_count += count
+        members.append({
+            'member_id': member_id,
+            'bill_count': count,
+            'total': float(outstanding or 0.0),
+            'oldest_due': oldest_due,
+            'buckets': dict(zip(AGING_BUCKETS, buckets)),
+        })
+
+    # Chronic defaulters first: rank by the oldest money owed, then the total
+    def rank_key(entry):
+        b = entry['buckets']
+        return (b['90+'], b['61-90'], b['31-60'], entry['total'])
+
+    defaulters = heapq.nlargest(top_k, members, key=rank_key) if top_k else []
+
+    # Only the ranked members need names, so fetch them in one query
+    if defaulters:
+        ids = [d['member_id'] for d in defaulters]
+        by_id = {m.id: m for m in Member.query.filter(Member.id.in_(ids))}
+        for entry in defaulters:
+            entry['member'] = by_id.get(entry['member_id'])
+
+    return {
+        'as_of': as_of,
+        'totals': totals,
+        'total_outstanding': total_outstanding,
+        'bill_count': bill_count,
+        'member_count': len(members),
+        'members': members,
+        'defaulters': defaulters,
+    }
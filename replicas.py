@@ -0,0 +1,82 @@
+# replicas.py
+from flask import g, request, session, has_app_context
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from tenancy import SocietySession
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ('GET', 'HEAD')
+STICKY_KEY = '_read_primary_until'
+
+
+def read_only(view):
+    """Mark a view as safe to serve from the read replica. Put it below @login_required."""
+    view.read_only = True
+    return view
+
+
+def _mark_write(db_session, flush_context):
+    if has_app_context():
+        g.db_wrote = True
+
+
+def init_app(app):
+    """
+    Route the reads of @read_only views to SQLALCHEMY_READ_DATABASE_URI.
+    Writes, flushes and every other view stay on the primary, and for
+    READ_STICKY_SECONDS after a browser session writes (or POSTs), its
+    reads stay on the primary too so it sees its own changes.
+    """
+    app.config.setdefault('SQLALCHEMY_READ_DATABASE_URI', None)
+    app.config.setdefault('READ_STICKY_SECONDS', 5)
+
+    uri = app.config['SQLALCHEMY_READ_DATABASE_URI']
+    if not uri:
+        return
+    if app.config.get('SOCIETY_STORAGE') == 'per_tenant':
+        logger.warning('Read replica routing is only supported with shared society storage; ignoring it')
+        return
+
+    app.extensions['read_engine'] = create_engine(uri)
+
+    if not event.contains(SocietySession, 'after_flush', _mark_write):
+        event.listen(SocietySession, 'after_flush', _mark_write)
+
+    @app.before_request
+    def choose_read_engine():
+        view = app.view_functions.get(request.endpoint)
+        g.use_replica = (
+            request.method in READ_METHODS
+            and getattr(view, 'read_only', False)
+            and session.get(STICKY_KEY, 0) < time.time()
+        )
+
+    @app.after_request
+    def stick_to_primary(response):
+        if g.get('db_wrote') or request.method not in READ_METHODS:
+            session[STICKY_KEY] = time.time() + app.config['READ_STICKY_SECONDS']
+        return response
+
+
+def sync(app):
+    """
+    Copy the primary SQLite database onto the replica file with the online
+    backup API. Stands in for real replication when testing locally.
+    """
+    primary = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    replica = make_url(app.config['SQLALCHEMY_READ_DATABASE_URI'])
+    if primary.get_backend_name() != 'sqlite' or replica.get_backend_name() != 'sqlite':
+        raise ValueError('replica sync only handles SQLite primaries and replicas')
+
+    source = sqlite3.connect(primary.database)
+    target = sqlite3.connect(replica.database)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    app.extensions['read_engine'].dispose()
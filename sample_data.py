@@ -0,0 +1,65 @@
+# sample_data.py
+# Bulk rows for the bench_*.py scripts and the tests, inserted with executemany so that
+# hundreds of thousands of bills take seconds. Run inside an app context.
+from datetime import date
+from extensions import db
+from models import Member, MaintenanceBill, Complaint
+from tenancy import current_society
+
+INSERT_BATCH = 50000
+
+
+def _insert(model, rows):
+    society = current_society()
+    for start in range(0, len(rows), INSERT_BATCH):
+        batch = rows[start:start + INSERT_BATCH]
+        for row in batch:
+            row.setdefault('society_id', society)
+        db.session.execute(model.__table__.insert(), batch)
+
+
+def add_members(count, first_id=1):
+    """Members first_id .. first_id + count - 1, flats numbered from 100 + id."""
+    _insert(Member, [
+        {'id': i, 'name': f'Member {i}', 'flat_no': str(100 + i), 'email': f'm{i}@example.com'}
+        for i in range(first_id, first_id + count)
+    ])
+    db.session.commit()
+
+
+def add_bills(count, member_count, amount=1800.0, **fields):
+    """
+    `count` bills spread round-robin over members 1..member_count. Any column
+    can be overridden with a value or a function of the bill's index, e.g.
+    due_date=lambda i: today - timedelta(days=i).
+    """
+    defaults = {'month': 1, 'year': 2025, 'due_date': date(2025, 12, 10), 'status': 'Unpaid'}
+    defaults.update(fields)
+    rows = []
+    for i in range(count):
+        row = {'member_id': i % member_count + 1, 'bill_number': f'BENCH/{i}',
+               'subtotal': amount, 'total_amount': amount}
+        for name, value in defaults.items():
+            row[name] = value(i) if callable(value) else value
+        rows.append(row)
+    _insert(MaintenanceBill, rows)
+    db.session.commit()
+
+
+def add_complaints(count, member_id=1, **fields):
+    """`count` Pending complaints; columns can be overridden as in add_bills()."""
+    defaults = {'category': 'Plumbing', 'priority': 'Low', 'status': 'Pending'}
+    defaults.update(fields)
+    rows = []
+    for i in range(count):
+        row = {'member_id': member_id, 'description': f'Complaint {i}'}
+        for name, value in defaults.items():
+            row[name] = value(i) if callable(value) else value
+        rows.append(row)
+    _insert(Complaint, rows)
+    db.session.commit()
+
+
+def login(client, username='admin', password='admin123'):
+    client.post('/login', data={'username': username, 'password': password})
+    return client
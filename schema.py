@@ -0,0 +1,99 @@
+# schema.py
+import sqlalchemy as sa
+
+
+def upgrade_schema(engine, metadata, default_society=None):
+    """
+    Additive upgrade for databases created by an older version of the app.
+
+    db.create_all() only creates missing tables, so columns and indexes added
+    to existing models are created here. Only ALTER TABLE ADD COLUMN is used,
+    which SQLite supports in place; new NOT NULL columns must carry a
+    server_default so existing rows get a value. A society_id column added to
+    an existing table is then set to default_society, the configured
+    DEFAULT_SOCIETY, since the server_default is the hardcoded 'default'.
+
+    The one exception is uniqueness: a UNIQUE constraint the models no longer
+    declare (e.g. user.username, now unique per society) cannot be dropped in
+    SQLite, so such tables are rebuilt with _rebuild_table().
+    """
+    inspector = sa.inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                ddl = sa.schema.CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(sa.text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+                if column.name == 'society_id' and default_society is not None:
+                    conn.execute(table.update().values(society_id=default_society))
+                added.append(f'{table.name}.{column.name}')
+
+            wanted = _unique_column_sets(table)
+            stale = [c['column_names'] for c in inspector.get_unique_constraints(table.name)
+                     if frozenset(c['column_names']) not in wanted]
+            existing_indexes = {}
+            for index in inspector.get_indexes(table.name):
+                if index['unique'] and frozenset(index['column_names']) not in wanted:
+                    conn.execute(sa.text(f'DROP INDEX {engine.dialect.identifier_preparer.quote(index["name"])}'))
+                    added.append(f'dropped {index["name"]}')
+                else:
+                    existing_indexes[index['name']] = index
+
+            if stale:
+                _rebuild_table(conn, table, engine.dialect)
+                added.append(f'{table.name} rebuilt without UNIQUE {", ".join("(" + ", ".join(c) + ")" for c in stale)}')
+                continue
+
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    added.append(index.name)
+
+    return added
+
+
+def _unique_column_sets(table):
+    """Column sets the model declares unique: primary key, unique constraints and unique indexes."""
+    sets = {frozenset(c.name for c in table.primary_key.columns)}
+    sets.update(frozenset(c.name for c in constraint.columns)
+                for constraint in table.constraints if isinstance(constraint, sa.UniqueConstraint))
+    sets.update(frozenset(c.name for c in index.columns) for index in table.indexes if index.unique)
+    return sets
+
+
+def _rebuild_table(conn, table, dialect):
+    """
+    SQLite's documented copy-and-swap: create the table as the model defines
+    it under a temporary name, copy the rows across, drop the old table and
+    rename the new one into place, then recreate the indexes. Foreign keys
+    elsewhere keep pointing at the same table name. Columns the model no
+    longer has are not copied.
+    """
+    if dialect.name != 'sqlite':
+        raise RuntimeError(
+            f'Table {table.name} still has UNIQUE constraints the models no longer declare. '
+            f'Migrate it by hand: only SQLite tables are rebuilt automatically.')
+
+    preparer = dialect.identifier_preparer
+    name = preparer.format_table(table)
+    temp = preparer.quote(f'_rebuild_{table.name}')
+    create = str(sa.schema.CreateTable(table).compile(dialect=dialect)).strip()
+    prefix = f'CREATE TABLE {name} ('
+    if not create.startswith(prefix):
+        raise RuntimeError(f'Unexpected DDL for {table.name}: {create[:80]}')
+    conn.execute(sa.text(f'CREATE TABLE {temp} (' + create[len(prefix):]))
+
+    columns = ', '.join(preparer.quote(c.name) for c in table.columns)
+    conn.execute(sa.text(f'INSERT INTO {temp} ({columns}) SELECT {columns} FROM {name}'))
+    conn.execute(sa.text(f'DROP TABLE {name}'))
+    conn.execute(sa.text(f'ALTER TABLE {temp} RENAME TO {name}'))
+    for index in table.indexes:
+        index.create(conn)
@@ -0,0 +1,204 @@
+# tenancy.py
+from flask import g, request, abort, current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import with_loader_criteria
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import os
+
+DEFAULT_SOCIETY = 'default'
+PATH_PREFIX = '/s/'
+ENVIRON_KEY = 'society.key'
+
+
+# ===== CURRENT SOCIETY =====
+def current_society():
+    """Society key for the current request (or CLI/background context)."""
+    if not has_app_context():
+        return DEFAULT_SOCIETY
+    society = g.get('society')
+    if society:
+        return society
+    return current_app.config.get('DEFAULT_SOCIETY', DEFAULT_SOCIETY)
+
+
+@contextmanager
+def society_context(society):
+    """Temporarily run queries as another society, e.g. from CLI commands or background jobs."""
+    previous = g.get('society')
+    g.society = society
+    try:
+        yield society
+    finally:
+        g.society = previous
+
+
+def known_societies(app):
+    societies = set(app.config.get('SOCIETIES') or [])
+    societies.add(app.config.get('DEFAULT_SOCIETY', DEFAULT_SOCIETY))
+    return societies
+
+
+# ===== ROUTING =====
+class SocietyRouter:
+    """
+    WSGI middleware that works out which society a request belongs to.
+
+    'host' routing takes the first label of the host name
+    (greenpark.example.com -> greenpark). 'path' routing takes a /s/<society>
+    prefix and moves it into SCRIPT_NAME, so the app's routes and url_for()
+    keep working unchanged under the prefix.
+    """
+
+    def __init__(self, wsgi_app, mode='none', base_domain=None):
+        self.wsgi_app = wsgi_app
+        self.mode = mode
+        self.base_domain = (base_domain or '').lower().lstrip('.')
+
+    def __call__(self, environ, start_response):
+        if self.mode == 'host':
+            environ[ENVIRON_KEY] = self._from_host(environ)
+        elif self.mode == 'path':
+            environ[ENVIRON_KEY] = self._from_path(environ)
+        return self.wsgi_app(environ, start_response)
+
+    def _from_host(self, environ):
+        host = (environ.get('HTTP_HOST') or environ.get('SERVER_NAME') or '').split(':')[0].lower()
+        if self.base_domain:
+            if not host.endswith('.' + self.base_domain):
+                return None
+            host = host[:-len(self.base_domain) - 1]
+        label = host.split('.')[0]
+        return label or None
+
+    def _from_path(self, environ):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(PATH_PREFIX):
+            return None
+        society, _, rest = path[len(PATH_PREFIX):].partition('/')
+        if not society:
+            return None
+        environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + PATH_PREFIX + society
+        environ['PATH_INFO'] = '/' + rest
+        return society
+
+
+# ===== STORAGE =====
+class SocietyEnginePool:
+    """
+    LRU cache of one SQLite engine per society, used by the 'per_tenant' storage mode.
+
+    Evicted engines are only dropped from the cache, not disposed: a request
+    may still be using one, and its connections are closed once the last
+    reference to the engine goes away.
+    """
+
+    def __init__(self, db_dir, metadata, max_size=32):
+        self.db_dir = db_dir
+        self.metadata = metadata
+        self.max_size = max_size
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(db_dir, exist_ok=True)
+
+    def get(self, society):
+        with self._lock:
+            engine = self._engines.get(society)
+            if engine is not None:
+                self._engines.move_to_end(society)
+                return engine
+
+            engine = self._create(society)
+            self._engines[society] = engine
+            if len(self._engines) > self.max_size:
+                self._engines.popitem(last=False)
+            return engine
+
+    def _create(self, society):
+        from schema import upgrade_schema
+
+        engine = create_engine('sqlite:///' + os.path.join(self.db_dir, f'{society}.db'))
+        self.metadata.create_all(engine)
+        upgrade_schema(engine, self.metadata, society)
+        return engine
+
+    def dispose(self):
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+
+class SocietySession(Session):
+    """
+    db.session class that sends queries to the current society's engine when
+    storage is per-tenant, and the reads of replica-routed requests (see
+    replicas.py) to the read engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            if g.get('use_replica') and not self._flushing and not getattr(clause, 'is_dml', False):
+                engine = current_app.extensions.get('read_engine')
+                if engine is not None:
+                    return engine
+            pool = current_app.extensions.get('society_engines')
+            if pool is not None:
+                return pool.get(current_society())
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _scope_to_society(execute_state):
+    """Add a society_id filter to every ORM select/update/delete on tenant-scoped models."""
+    from models import TenantMixin
+
+    if execute_state.is_column_load:
+        return
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    if execute_state.execution_options.get('all_societies', False):
+        return
+
+    society = current_society()
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(
+            TenantMixin,
+            lambda cls: cls.society_id == society,
+            include_aliases=True
+        )
+    )
+
+
+def init_app(app, db):
+    app.config.setdefault('DEFAULT_SOCIETY', DEFAULT_SOCIETY)
+    app.config.setdefault('SOCIETIES', [])
+    app.config.setdefault('SOCIETY_ROUTING', 'none')  # 'none', 'host' or 'path'
+    app.config.setdefault('SOCIETY_BASE_DOMAIN', None)
+    app.config.setdefault('SOCIETY_STORAGE', 'shared')  # 'shared' or 'per_tenant'
+    app.config.setdefault('SOCIETY_DB_DIR', os.path.join(app.instance_path, 'societies'))
+    app.config.setdefault('SOCIETY_ENGINE_CACHE_SIZE', 32)
+
+    if not event.contains(SocietySession, 'do_orm_execute', _scope_to_society):
+        event.listen(SocietySession, 'do_orm_execute', _scope_to_society)
+
+    if app.config['SOCIETY_STORAGE'] == 'per_tenant':
+        app.extensions['society_engines'] = SocietyEnginePool(
+            app.config['SOCIETY_DB_DIR'],
+            db.metadata,
+            max_size=app.config['SOCIETY_ENGINE_CACHE_SIZE']
+        )
+
+    app.wsgi_app = SocietyRouter(
+        app.wsgi_app,
+        mode=app.config['SOCIETY_ROUTING'],
+        base_domain=app.config['SOCIETY_BASE_DOMAIN']
+    )
+
+    @app.before_request
+    def resolve_society():
+        society = request.environ.get(ENVIRON_KEY) or app.config['DEFAULT_SOCIETY']
+        if society not in known_societies(app):
+            abort(404)
+        g.society = society
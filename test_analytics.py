@@ -0,0 +1,82 @@
+# test_analytics.py
+from datetime import datetime
+
+import pytest
+
+import analytics
+import sample_data
+from extensions import db
+from models import Complaint, ComplaintWeeklyStats, ComplaintResolveHistogram, Member
+
+
+@pytest.fixture
+def admin(app, client):
+    with app.app_context():
+        for model in (Complaint, ComplaintWeeklyStats, ComplaintResolveHistogram):
+            model.query.delete()
+        db.session.commit()
+        member_id = Member.query.first().id
+    sample_data.login(client)
+    for category in ('Plumbing', 'Plumbing', 'Electrical'):
+        client.post('/admin/complaints/add', data={'description': 'Broken', 'member_id': member_id,
+                                                   'category': category, 'priority': 'High'})
+    return client
+
+
+def complaint_ids(app):
+    with app.app_context():
+        return [c.id for c in Complaint.query.order_by(Complaint.id)]
+
+
+def trends(client, **args):
+    return client.get('/admin/complaints/analytics.json', query_string=args).get_json()
+
+
+def test_counts_follow_status_changes(app, admin):
+    first, second, third = complaint_ids(app)
+    admin.get(f'/admin/complaints/update/{first}/Completed')
+    admin.get(f'/admin/complaints/update/{second}/Completed')
+    admin.get(f'/admin/complaints/update/{second}/In Progress')
+
+    summary = trends(admin)['summary']
+    assert (summary['created'], summary['resolved'], summary['open']) == (3, 1, 2)
+    assert summary['p90_hours'] is not None and summary['p90_hours'] <= 1
+    assert trends(admin, category='Electrical')['summary']['resolved'] == 0
+
+    admin.get(f'/admin/complaints/delete/{third}')
+    summary = trends(admin)['summary']
+    assert (summary['created'], summary['resolved'], summary['open']) == (3, 1, 1)
+
+
+def test_incremental_rollups_match_rebuild(app, admin):
+    ids = complaint_ids(app)
+    for complaint_id in ids[:2]:
+        admin.get(f'/admin/complaints/update/{complaint_id}/Completed')
+    admin.get(f'/admin/complaints/update/{ids[0]}/Pending')
+    incremental = trends(admin, weeks=4)
+    with app.app_context():
+        analytics.rebuild()
+    assert trends(admin, weeks=4) == incremental
+
+
+def test_databases_without_upsert_update_then_insert(app, monkeypatch):
+    monkeypatch.setattr(analytics, '_UPSERTS', {})
+    complaint = Complaint(description='Stuck', category='Lift', date_requested=datetime(2025, 1, 1))
+    with app.app_context():
+        for _ in range(2):
+            analytics.on_created(complaint)
+        db.session.commit()
+        assert ComplaintWeeklyStats.query.filter_by(category='Lift').one().created_count == 2
+
+
+def test_weeks_are_clamped(admin):
+    data = trends(admin, weeks=0)
+    assert len(data['weeks']) == 1 and data['created'] == {'Electrical': [1], 'Plumbing': [2]}
+    assert len(trends(admin, weeks=100000)['weeks']) == analytics.MAX_WEEKS
+
+
+def test_percentile_interpolates_within_bucket():
+    assert analytics._percentile({0: 10}, 0.9) == pytest.approx(0.9)
+    assert analytics._percentile({0: 5, 1: 5}, 0.9) == pytest.approx(1.8)
+    assert analytics._percentile({len(analytics.RESOLVE_BUCKET_HOURS): 1}, 0.9) == 1440.0
+    assert analytics._percentile({}, 0.9) is None
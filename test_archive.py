@@ -0,0 +1,83 @@
+# test_archive.py
+from datetime import date
+
+import pytest
+
+import archive
+import sample_data
+from extensions import db
+from main import archive_history
+from models import ArchiveBatch, ArchiveBatchMember, MaintenanceBill, Member
+
+
+@pytest.fixture
+def bills(app):
+    with app.app_context():
+        MaintenanceBill.query.delete()
+        db.session.commit()
+        member_count = Member.query.count()
+        # BENCH/0..3 paid in 2020, BENCH/4 unpaid in 2020, BENCH/5 paid this month
+        this_month = date.today()
+        sample_data.add_bills(6, member_count,
+                              status=lambda i: 'Unpaid' if i == 4 else 'Paid',
+                              year=lambda i: this_month.year if i == 5 else 2020,
+                              month=lambda i: this_month.month if i == 5 else i % 2 + 1,
+                              paid_date=lambda i: None if i == 4 else date(2020, 3, 1))
+    return app
+
+
+def test_cutoff_is_start_of_month():
+    assert archive._cutoff(12, today=date(2025, 3, 15)) == date(2024, 3, 1)
+    assert archive._cutoff(3, today=date(2025, 2, 28)) == date(2024, 11, 1)
+
+
+def test_archives_only_old_paid_bills(bills):
+    runner = bills.test_cli_runner()
+    assert '[default] would archive 4 bills' in runner.invoke(archive_history, ['--months', '12', '--dry-run']).output
+    assert '[default] archived 4 bills' in runner.invoke(archive_history, ['--months', '12']).output
+
+    with bills.app_context():
+        assert sorted(b.bill_number for b in MaintenanceBill.query) == ['BENCH/4', 'BENCH/5']
+        assert sorted(b.period for b in ArchiveBatch.query) == ['2020-01', '2020-02']
+        assert archive.totals('bill') == (4, 4 * 1800.0)
+
+        history = archive.history('bill')
+        assert [b.bill_number for b in history] == ['BENCH/1', 'BENCH/3', 'BENCH/0', 'BENCH/2']
+        assert history[0].archived and history[0].paid_date == date(2020, 3, 1)
+        assert history[0].member.id == history[0].member_id
+        member_id = history[0].member_id
+        assert ([b.bill_number for b in archive.history('bill', member_id=member_id)]
+                == [b.bill_number for b in history if b.member_id == member_id])
+        assert len(archive.history('bill', member_id=member_id)) < len(history)
+
+    assert '[default] archived 0 bills' in runner.invoke(archive_history, ['--months', '12']).output
+
+
+def test_member_history_only_decompresses_their_batches(bills, monkeypatch):
+    bills.test_cli_runner().invoke(archive_history, ['--months', '12'])
+    decoded = []
+    decode = archive._decode
+    monkeypatch.setattr(archive, '_decode', lambda model, payload: decoded.append(payload) or decode(model, payload))
+
+    with bills.app_context():
+        member_id = archive.history('bill')[0].member_id
+        batches = ArchiveBatch.query.join(ArchiveBatchMember).filter(ArchiveBatchMember.member_id == member_id).all()
+        decoded.clear()
+        assert {b.member_id for b in archive.history('bill', member_id=member_id)} == {member_id}
+        assert len(decoded) == len(batches) < ArchiveBatch.query.count()
+
+        # Batches written before member ids were recorded are still searched
+        legacy = ArchiveBatch.query.filter(~ArchiveBatch.id.in_([b.id for b in batches])).first()
+        legacy.members = []
+        db.session.commit()
+        decoded.clear()
+        archive.history('bill', member_id=member_id)
+        assert len(decoded) == len(batches) + 1
+
+
+def test_billing_page_includes_archive_on_request(bills, client):
+    bills.test_cli_runner().invoke(archive_history, ['--months', '12'])
+    sample_data.login(client)
+    assert b'BENCH/0<' not in client.get('/admin/billing').data
+    page = client.get('/admin/billing?history=1').data
+    assert b'BENCH/0<' in page and b'BENCH/5<' in page
@@ -0,0 +1,85 @@
+# test_assets.py
+import gzip
+import os
+import shutil
+
+import pytest
+
+import assets
+import sample_data
+
+STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    directory = str(tmp_path / 'static')
+    shutil.copytree(STATIC, directory, ignore=shutil.ignore_patterns('dist'))
+    return directory
+
+
+@pytest.fixture
+def app_settings(static_dir):
+    out_dir = os.path.join(static_dir, 'dist')
+    assets.build(static_dir, out_dir)
+    return {'ASSETS_DIR': out_dir}
+
+
+@pytest.fixture
+def built(app, static_dir):
+    app.static_folder = static_dir
+    return app
+
+
+def test_build_fingerprints_and_precompresses(static_dir):
+    with open(os.path.join(static_dir, 'tiny.css'), 'w') as f:
+        f.write('a{}')
+    out_dir = os.path.join(static_dir, 'dist')
+    manifest = assets.build(static_dir, out_dir)
+
+    assert set(manifest) == {'css/base.css', 'js/base.js', 'main.js', 'style.css', 'tiny.css'}
+    built = os.path.join(static_dir, manifest['css/base.css'])
+    assert manifest['css/base.css'].startswith('dist/css/base.') and os.path.isfile(built)
+    with open(built, 'rb') as f, gzip.open(built + '.gz') as z:
+        assert z.read() == f.read()
+    assert not os.path.exists(os.path.join(static_dir, manifest['tiny.css']) + '.gz')
+    assert assets.build(static_dir, out_dir) == manifest == assets.load_manifest(out_dir)
+
+
+def test_fingerprinted_assets_served_precompressed_and_immutable(built, client):
+    page = client.get('/login').data.decode()
+    url = '/static/' + built.extensions['asset_manifest']['css/base.css']
+    assert url in page
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Cache-Control'] == assets.IMMUTABLE
+    assert response.mimetype == 'text/css'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    assert gzip.decompress(response.data) == plain.data
+    assert 'Content-Encoding' not in client.get(url, headers={'Accept-Encoding': 'gzip;q=0, br;q=0'}).headers
+
+
+def test_stale_fingerprint_falls_back_to_current_file(built, client):
+    response = client.get('/static/dist/css/base.000000000000.css')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] != assets.IMMUTABLE
+    assert client.get('/static/dist/css/missing.000000000000.css').status_code == 404
+
+
+def test_html_gzipped_when_large_enough(app, client):
+    sample_data.login(client)
+    response = client.get('/admin/billing', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data).rstrip().endswith(b'</html>')
+
+    app.config['COMPRESS_MIN_SIZE'] = 10 ** 7
+    response = client.get('/login', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Content-Encoding' not in client.get('/admin/billing').headers
+
+    app.config['COMPRESS_MIN_SIZE'] = 0
+    assert 'Content-Encoding' not in client.get('/login', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+    assert client.get('/login', headers={'Accept-Encoding': '*'}).headers['Content-Encoding'] == 'gzip'
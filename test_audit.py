@@ -0,0 +1,73 @@
+# test_audit.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+import audit
+import sample_data
+from audit import AuditWriter
+from extensions import db
+from models import AuditEvent
+
+
+def events(action):
+    return AuditEvent.query.filter_by(action=action).order_by(AuditEvent.id).all()
+
+
+def test_written_on_commit_dropped_on_rollback(app):
+    writer = app.extensions['audit']
+    with app.app_context():
+        audit.record('test.kept', 'notice', 1, 'kept', reason='x')
+        db.session.commit()
+        audit.record('test.dropped', 'notice', 2, 'dropped')
+        db.session.rollback()
+        writer.flush()
+
+        [event] = events('test.kept')
+        assert (event.actor, event.entity, event.entity_id, event.details) == ('system', 'notice', 1, '{"reason": "x"}')
+        assert events('test.dropped') == []
+
+
+def test_append_only(app):
+    with app.app_context():
+        audit.record('test.kept', 'notice', 1)
+        db.session.commit()
+        app.extensions['audit'].flush()
+        for statement in (AuditEvent.__table__.update().values(actor='someone'), AuditEvent.__table__.delete()):
+            with pytest.raises(DBAPIError, match='append-only'):
+                with db.engine.begin() as conn:
+                    conn.execute(statement)
+
+
+def row(action):
+    return {'society_id': 'default', 'created_at': datetime.now(), 'actor': 'system',
+            'action': action, 'entity': 'notice'}
+
+
+def test_overflow_and_close_write_everything(app):
+    writer = AuditWriter(app, max_queue=2, flush_interval=60)
+    writer.submit([row('test.batch')] * 3)
+    assert writer.stats()['overflow'] == 1
+    writer.close()
+    writer.submit([row('test.batch')])
+    with app.app_context():
+        assert len(events('test.batch')) == 4
+    assert writer.stats()['written'] == 4
+
+
+def test_admin_actions_listed_and_filtered(app, client):
+    app.config['AUDIT_PAGE_SIZE'] = 2
+    sample_data.login(client)
+    for title in ('First notice', 'Second notice', 'Third notice'):
+        client.post('/admin/notices/add', data={'title': title, 'content': '...'})
+    app.extensions['audit'].flush()
+
+    page = client.get('/admin/audit?action=notice.posted&actor=admin').data
+    assert b'Third notice' in page and b'Second notice' in page and b'First notice' not in page
+    with app.app_context():
+        first_page, has_more = audit.search(action='notice.posted', limit=2)
+        assert has_more
+        rest, has_more = audit.search(action='notice.posted', before=first_page[-1].id, limit=2)
+        assert [e.summary for e in rest] == ['First notice'] and not has_more
+    assert b'Third notice' not in client.get('/admin/audit?actor=nobody').data
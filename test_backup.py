@@ -0,0 +1,73 @@
+# test_backup.py
+import os
+import sqlite3
+
+import backup
+
+
+def touch(directory, *names):
+    for name in names:
+        open(os.path.join(directory, name), 'wb').close()
+
+
+def test_prune_keeps_other_societies_sharing_a_name_prefix(tmp_path):
+    touch(tmp_path,
+          'green-20260101-000000.db.gz', 'green-20260102-000000.db.gz', 'green-20260103-000000.db.gz',
+          'green-park-20260104-000000.db.gz', 'green-park-20260105-000000.db.gz')
+
+    removed = backup.prune(str(tmp_path), 'green', 2)
+
+    assert [os.path.basename(p) for p in removed] == ['green-20260101-000000.db.gz']
+    assert sorted(os.listdir(tmp_path)) == [
+        'green-20260102-000000.db.gz', 'green-20260103-000000.db.gz',
+        'green-park-20260104-000000.db.gz', 'green-park-20260105-000000.db.gz',
+    ]
+    assert backup.prune(str(tmp_path), 'green-park', 2) == []
+
+
+def test_list_snapshots_ignores_unrelated_files(tmp_path):
+    touch(tmp_path, 'green-20260101-000000.db.gz', 'green-20260101-000000.db.gz.tmp', 'green-notes.db.gz', 'tmpabc.db')
+
+    assert [os.path.basename(p) for p in backup.list_snapshots(str(tmp_path), 'green')] == [
+        'green-20260101-000000.db.gz']
+    assert backup.snapshot_name('green-park-20260104-000000.db.gz') == 'green-park'
+
+
+def test_snapshots_in_the_same_second_are_kept_apart(tmp_path):
+    source = str(tmp_path / 'live.db')
+    sqlite3.connect(source).close()
+    touch(tmp_path, 'live-20200101-000000.db.gz')
+
+    first, _, _ = backup.snapshot('live', source, str(tmp_path), pages=16, pause=0)
+    second, _, _ = backup.snapshot('live', source, str(tmp_path), pages=16, pause=0)
+
+    assert first != second
+    assert backup.list_snapshots(str(tmp_path), 'live') == [str(tmp_path / 'live-20200101-000000.db.gz'), first, second]
+    assert backup.snapshot_name(second) == 'live'
+
+
+def test_snapshot_verify_and_restore_round_trip(tmp_path):
+    source = str(tmp_path / 'live.db')
+    conn = sqlite3.connect(source)
+    conn.execute('CREATE TABLE bill (id INTEGER PRIMARY KEY, amount REAL)')
+    conn.executemany('INSERT INTO bill (amount) VALUES (?)', [(i,) for i in range(5000)])
+    conn.commit()
+
+    path, _, size = backup.snapshot('live', source, str(tmp_path / 'backups'), pages=16, pause=0)
+    assert size > 0
+    assert backup.verify(path) == (True, 'ok', {'bill': 5000})
+
+    conn.execute('DELETE FROM bill')
+    conn.commit()
+    conn.close()
+    assert backup.restore(path, source) == {'bill': 5000}
+    assert sqlite3.connect(source).execute('SELECT COUNT(*) FROM bill').fetchone()[0] == 5000
+
+
+def test_run_snapshots_the_app_database_and_applies_retention(app):
+    app.config['BACKUP_KEEP'] = 1
+    (path, _, _), = backup.run(app)
+
+    assert backup.snapshot_name(path) == 'society'
+    assert backup.verify(path)[0]
+    assert backup.list_snapshots(app.config['BACKUP_DIR'], 'society') == [path]
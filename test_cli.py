@@ -0,0 +1,96 @@
+# test_cli.py
+import pytest
+
+import dispatch
+from main import create_app, create_db, seed, rebuild_dispatch, rebuild_analytics
+from extensions import db
+from models import User, Complaint, ComplaintWeeklyStats
+from tenancy import society_context
+
+
+@pytest.fixture(params=['shared', 'per_tenant'])
+def societies_app(request, tmp_path):
+    app = create_app('testing',
+                     SQLALCHEMY_DATABASE_URI='sqlite:///' + str(tmp_path / 'society.db'),
+                     SOCIETY_DB_DIR=str(tmp_path / 'societies'),
+                     SOCIETY_STORAGE=request.param,
+                     SOCIETIES=['alpha', 'beta'])
+    result = app.test_cli_runner().invoke(create_db)
+    assert result.exit_code == 0, result.output
+    yield app
+    app.extensions['audit'].close()
+
+
+def users_by_society(app):
+    with app.app_context():
+        counts = {}
+        for society in ('default', 'alpha', 'beta'):
+            with society_context(society):
+                counts[society] = sorted(u.username for u in User.query)
+        return counts
+
+
+def test_seed_creates_users_in_every_society(societies_app):
+    result = societies_app.test_cli_runner().invoke(seed)
+
+    assert result.exit_code == 0, result.output
+    assert users_by_society(societies_app) == {s: ['admin', 'john'] for s in ('default', 'alpha', 'beta')}
+
+
+def test_seed_one_society(societies_app):
+    runner = societies_app.test_cli_runner()
+    runner.invoke(seed, ['--society', 'beta'])
+
+    assert users_by_society(societies_app) == {'default': [], 'alpha': [], 'beta': ['admin', 'john']}
+    assert 'Users already exist' in runner.invoke(seed, ['--society', 'beta']).output
+
+
+def test_unknown_society_is_rejected(societies_app):
+    result = societies_app.test_cli_runner().invoke(seed, ['--society', 'gamma'])
+
+    assert result.exit_code != 0
+    assert "unknown society 'gamma'" in result.output
+
+
+def test_seeded_admin_can_log_in_to_another_society(societies_app):
+    societies_app.config['SOCIETY_ROUTING'] = 'path'
+    societies_app.test_cli_runner().invoke(seed)
+    app = create_app('testing', **{k: societies_app.config[k] for k in (
+        'SQLALCHEMY_DATABASE_URI', 'SOCIETY_DB_DIR', 'SOCIETY_STORAGE', 'SOCIETIES', 'SOCIETY_ROUTING')})
+
+    response = app.test_client().post('/s/alpha/login', data={'username': 'admin', 'password': 'admin123'})
+
+    assert response.status_code == 302
+    assert response.location.endswith('/s/alpha/admin/dashboard')
+    app.extensions['audit'].close()
+
+
+def test_rebuild_commands_cover_every_society(societies_app):
+    runner = societies_app.test_cli_runner()
+    runner.invoke(seed)
+    with societies_app.app_context():
+        for society, count in (('alpha', 2), ('beta', 3)):
+            with society_context(society):
+                db.session.add_all(Complaint(description='x', member_id=1, category='Plumbing') for _ in range(count))
+                db.session.commit()
+
+    assert '[beta] Rebuilt dispatch data for 3 complaints' in runner.invoke(rebuild_dispatch).output
+    output = runner.invoke(rebuild_analytics).output
+    assert '[alpha] Rebuilt complaint analytics from 2 complaints' in output
+
+    with societies_app.app_context(), society_context('beta'):
+        assert db.session.query(db.func.sum(ComplaintWeeklyStats.created_count)).scalar() == 3
+        assert Complaint.query.filter(Complaint.priority_rank.isnot(None)).count() == 3
+
+
+def test_create_db_ranks_complaints_saved_before_the_queue(societies_app):
+    runner = societies_app.test_cli_runner()
+    runner.invoke(seed)
+    with societies_app.app_context(), society_context('alpha'):
+        db.session.add_all(Complaint(description=priority or 'x', member_id=1, priority=priority)
+                           for priority in ('Low', 'Urgent', None))
+        db.session.commit()
+
+    assert '[alpha] Ranked 3 complaints for the dispatch queue' in runner.invoke(create_db).output
+    with societies_app.app_context(), society_context('alpha'):
+        assert [c.description for c in dispatch.open_queue()] == ['Urgent', 'x', 'Low']
@@ -0,0 +1,75 @@
+# test_concurrency.py
+import pytest
+
+import concurrency
+import sample_data
+from concurrency import run_with_retry, ConflictError
+from extensions import db
+from models import MaintenanceBill
+
+
+@pytest.fixture
+def bill_id(app):
+    with app.app_context():
+        MaintenanceBill.query.delete()
+        db.session.commit()
+        sample_data.add_bills(1, 1)
+        return MaintenanceBill.query.one().id
+
+
+def bump_version(bill_id):
+    """A concurrent writer: change the row behind the session's back."""
+    with db.engine.begin() as conn:
+        conn.execute(MaintenanceBill.__table__.update().where(MaintenanceBill.id == bill_id)
+                     .values(version=MaintenanceBill.version + 1))
+
+
+def test_conflict_is_retried_against_fresh_rows(app, bill_id):
+    calls = []
+
+    def apply():
+        bill = db.session.get(MaintenanceBill, bill_id)
+        calls.append(bill.version)
+        if len(calls) == 1:
+            bump_version(bill_id)
+        bill.status = 'Paid'
+        return len(calls)
+
+    with app.app_context():
+        before = concurrency.stats()
+        assert run_with_retry(apply, backoff=0) == 2
+        assert calls == [1, 2]
+        assert db.session.get(MaintenanceBill, bill_id).status == 'Paid'
+        after = concurrency.stats()
+    assert after['conflicts'] - before['conflicts'] == 1
+    assert after['commits'] - before['commits'] == 1
+
+
+def test_gives_up_after_attempts(app, bill_id):
+    def apply():
+        bill = db.session.get(MaintenanceBill, bill_id)
+        bump_version(bill_id)
+        bill.status = 'Paid'
+
+    with app.app_context():
+        before = concurrency.stats()['gave_up']
+        with pytest.raises(ConflictError):
+            run_with_retry(apply, attempts=3, backoff=0)
+        assert concurrency.stats()['gave_up'] == before + 1
+        assert db.session.get(MaintenanceBill, bill_id).status == 'Unpaid'
+
+
+def test_mark_paid_checks_expected_version(app, client, bill_id):
+    sample_data.login(client)
+    response = client.post(f'/admin/billing/mark-paid/{bill_id}', data={'version': 7, 'payment_method': 'Cash'},
+                           follow_redirects=True)
+    assert b'updated by someone else' in response.data
+    with app.app_context():
+        assert db.session.get(MaintenanceBill, bill_id).status == 'Unpaid'
+
+    client.post(f'/admin/billing/mark-paid/{bill_id}', data={'version': 1, 'payment_method': 'Cash'})
+    response = client.post(f'/admin/billing/mark-paid/{bill_id}', data={'version': 1}, follow_redirects=True)
+    assert b'already marked as paid' in response.data
+    with app.app_context():
+        bill = db.session.get(MaintenanceBill, bill_id)
+        assert (bill.status, bill.payment_method, bill.version) == ('Paid', 'Cash', 2)
@@ -0,0 +1,70 @@
+# test_documents.py
+import os
+import re
+
+import pytest
+
+import documents
+import sample_data
+from extensions import db
+from main import generate_documents
+from models import MaintenanceBill, Member
+
+
+@pytest.fixture
+def bills(app):
+    with app.app_context():
+        MaintenanceBill.query.delete()
+        db.session.commit()
+        sample_data.add_bills(5, Member.query.count(), month=3,
+                              status=lambda i: 'Paid' if i < 2 else 'Unpaid')
+    return app
+
+
+def cached_files(app):
+    return sorted(name for _, _, files in os.walk(app.config['DOCUMENT_CACHE_DIR']) for name in files)
+
+
+def test_pdf_layout():
+    pdf = documents.build_pdf(['# Title (bold)'] + [f'line {i}' for i in range(130)])
+    assert pdf.startswith(b'%PDF-1.4') and pdf.endswith(b'%%EOF\n')
+    assert b'/Count 3' in pdf
+    assert b'(Title \\(bold\\)) Tj' in pdf
+    xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+    offsets = re.findall(rb'(\d{10}) 00000 n', pdf[xref:])
+    for number, offset in enumerate(offsets, start=1):
+        assert pdf[int(offset):].startswith(b'%d 0 obj' % number)
+
+
+def test_generate_period_renders_once(bills):
+    runner = bills.test_cli_runner()
+    assert 'Rendered 7 documents for 3/2025 (0 already cached)' in runner.invoke(
+        generate_documents, ['3', '2025', '--workers', '2']).output
+    assert len(cached_files(bills)) == 7
+    assert 'Rendered 0 documents for 3/2025 (7 already cached)' in runner.invoke(
+        generate_documents, ['3', '2025', '--workers', '2']).output
+
+    with bills.app_context():
+        MaintenanceBill.query.filter_by(bill_number='BENCH/4').update({MaintenanceBill.status: 'Paid'})
+        db.session.commit()
+    assert 'Rendered 2 documents for 3/2025 (6 already cached)' in runner.invoke(
+        generate_documents, ['3', '2025', '--workers', '2']).output
+
+
+def test_download_checks_owner_and_status(bills, client):
+    with bills.app_context():
+        john = Member.query.filter_by(email='john@example.com').one()
+        own = MaintenanceBill.query.filter_by(member_id=john.id, status='Paid').first()
+        other = MaintenanceBill.query.filter(MaintenanceBill.member_id != john.id).first()
+        unpaid = MaintenanceBill.query.filter_by(status='Unpaid').first()
+
+    sample_data.login(client, 'john', 'john123')
+    response = client.get(f'/bills/{own.id}/receipt.pdf')
+    assert response.mimetype == 'application/pdf' and response.data.startswith(b'%PDF')
+    assert client.get(f'/bills/{own.id}/receipt.pdf', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert client.get(f'/bills/{other.id}/bill.pdf').status_code == 302
+    assert client.get(f'/bills/{own.id}/invoice.pdf').status_code == 404
+
+    sample_data.login(client)
+    assert client.get(f'/bills/{unpaid.id}/receipt.pdf').status_code == 302
+    assert client.get(f'/bills/{unpaid.id}/bill.pdf').status_code == 200
@@ -0,0 +1,31 @@
+# test_factory.py
+import os
+
+import sample_data
+from main import create_app, create_db, seed
+from extensions import db
+from models import User
+
+
+def test_factory_does_not_touch_database(tmp_path):
+    path = tmp_path / 'society.db'
+    app = create_app('testing', SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}')
+    assert app.testing and app.config['SQLALCHEMY_DATABASE_URI'] == f'sqlite:///{path}'
+    assert {'login', 'admin_dashboard', 'resident_dashboard', 'admin_billing'} <= set(app.view_functions)
+    app.test_client().get('/login')
+    assert not os.path.exists(path)
+
+
+def test_create_db_and_seed_are_idempotent(tmp_path):
+    app = create_app('testing', SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "society.db"}')
+    runner = app.test_cli_runner()
+    for _ in range(2):
+        assert runner.invoke(create_db).exit_code == 0
+        assert runner.invoke(seed).exit_code == 0
+    with app.app_context():
+        assert User.query.filter_by(username='admin').count() == 1
+        db.engine.dispose()
+
+    client = sample_data.login(app.test_client())
+    assert client.get('/admin/dashboard').status_code == 200
+    app.extensions['audit'].close()
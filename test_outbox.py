@@ -0,0 +1,112 @@
+# test_outbox.py
+import smtplib
+import threading
+
+import pytest
+
+import outbox
+from extensions import db
+from models import OutboxMessage
+from outbox import Dispatcher, SmtpTransport
+
+
+class FakeSMTP:
+    """Stands in for smtplib.SMTP; records every connection opened."""
+    opened = []
+    lock = threading.Lock()
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        self.drop_next = False
+        with self.lock:
+            self.opened.append(self)
+
+    def send_message(self, msg):
+        if self.drop_next:
+            self.drop_next = False
+            raise smtplib.SMTPServerDisconnected('idle timeout')
+        self.sent.append(msg['To'])
+
+    def quit(self):
+        self.closed = True
+
+    close = quit
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    FakeSMTP.opened = []
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    return FakeSMTP
+
+
+def enqueue(count):
+    for i in range(count):
+        outbox.enqueue('test', f'r{i}@example.com', 'Subject', 'Body')
+    db.session.commit()
+
+
+def test_connections_reused_across_batches(app, smtp):
+    transport = SmtpTransport('mail.local')
+    dispatcher = Dispatcher({'email': transport}, concurrency={'email': 3}, batch_size=10)
+    with app.app_context():
+        OutboxMessage.query.delete()
+        enqueue(60)
+        assert dispatcher.drain() == (60, 0)
+        enqueue(60)
+        assert dispatcher.drain() == (60, 0)
+
+    assert 1 <= len(smtp.opened) <= 3
+    assert len(transport._connections) == len(smtp.opened)
+    assert sum(len(conn.sent) for conn in smtp.opened) == 120
+
+    dispatcher.close()
+    assert all(conn.closed for conn in smtp.opened)
+    assert transport._connections == []
+
+
+def test_reconnect_discards_dead_connection(smtp):
+    transport = SmtpTransport('mail.local')
+    transport.send(1, 'a@example.com', 'Subject', 'Body')
+    dead = smtp.opened[0]
+    dead.drop_next = True
+
+    transport.send(2, 'b@example.com', 'Subject', 'Body')
+
+    assert dead.closed
+    assert len(smtp.opened) == 2
+    assert transport._connections == [smtp.opened[1]]
+    assert smtp.opened[1].sent == ['b@example.com']
+
+
+def test_failures_back_off_then_give_up(app):
+    class Failing:
+        def send(self, *job):
+            raise OSError('connection refused')
+
+        def close(self):
+            pass
+
+    dispatcher = Dispatcher({'email': Failing()}, max_attempts=2, backoff_seconds=0)
+    with app.app_context():
+        OutboxMessage.query.delete()
+        enqueue(1)
+        assert dispatcher.drain_once() == (0, 1)
+        message = OutboxMessage.query.one()
+        assert (message.status, message.attempts, message.last_error) == ('pending', 1, 'connection refused')
+        assert dispatcher.drain_once() == (0, 1)
+        db.session.refresh(message)
+        assert (message.status, message.attempts) == ('failed', 2)
+        assert dispatcher.drain_once() == (0, 0)
+    dispatcher.close()
+
+
+def test_enqueued_only_on_commit(app):
+    with app.app_context():
+        OutboxMessage.query.delete()
+        db.session.commit()
+        outbox.enqueue('test', 'r@example.com', 'Subject', 'Body')
+        db.session.rollback()
+        assert OutboxMessage.query.count() == 0
+        assert outbox.enqueue('test', None, 'Subject', 'Body') is None
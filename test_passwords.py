@@ -0,0 +1,66 @@
+# test_passwords.py
+from werkzeug.security import generate_password_hash
+
+import pytest
+
+from passwords import PasswordHasher, hash_method, expand_method
+
+
+@pytest.mark.parametrize('method', ['pbkdf2', 'pbkdf2:sha256', 'pbkdf2:sha256:1000', 'scrypt'])
+def test_hash_made_with_configured_method_needs_no_rehash(method):
+    hasher = PasswordHasher(method, cache_ttl=0)
+    stored = hasher.hash('secret')
+
+    assert hasher.verify(stored, 'secret') == (True, False)
+    assert hasher.verify(stored, 'wrong') == (False, False)
+    hasher.shutdown()
+
+
+@pytest.mark.parametrize('method', ['pbkdf2', 'pbkdf2:sha256', 'pbkdf2:sha512:1000', 'scrypt', 'scrypt:16384:8:1'])
+def test_expand_method_matches_what_werkzeug_stores(method):
+    assert expand_method(method) == hash_method(generate_password_hash('x', method=method))
+
+
+def test_dummy_hash_is_made_on_first_use():
+    hasher = PasswordHasher('pbkdf2:sha256:1000')
+    assert hasher._dummy is None
+
+    hasher.verify_dummy('guess')
+    assert hash_method(hasher._dummy) == 'pbkdf2:sha256:1000'
+    hasher.shutdown()
+
+
+def test_hash_with_other_parameters_is_upgraded():
+    hasher = PasswordHasher('pbkdf2:sha256:2000', cache_ttl=0)
+    stored = generate_password_hash('secret', method='pbkdf2:sha256:1000')
+
+    assert hasher.verify(stored, 'secret') == (True, True)
+    hasher.shutdown()
+
+
+def test_plaintext_row_is_upgraded_on_match_only():
+    hasher = PasswordHasher('pbkdf2:sha256:1000')
+
+    assert hasher.verify('secret', 'secret') == (True, True)
+    assert hasher.verify('secret', 'nope') == (False, False)
+    hasher.shutdown()
+
+
+def test_login_rehashes_old_hash_once(app, client):
+    from extensions import db
+    from models import User
+
+    with app.app_context():
+        user = User.query.filter_by(username='john').first()
+        user.password = generate_password_hash('john123', method='pbkdf2:sha256:500')
+        db.session.commit()
+
+    client.post('/login', data={'username': 'john', 'password': 'john123'})
+    with app.app_context():
+        upgraded = User.query.filter_by(username='john').first().password
+    assert hash_method(upgraded) == 'pbkdf2:sha256:1000'
+
+    client.get('/logout')
+    client.post('/login', data={'username': 'john', 'password': 'john123'})
+    with app.app_context():
+        assert User.query.filter_by(username='john').first().password == upgraded
@@ -0,0 +1,43 @@
+# test_profiler.py
+import os
+
+import sample_data
+
+
+def folded(app):
+    directory = app.config['PROFILE_DIR']
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+def test_admin_can_profile_a_request(app, client):
+    sample_data.login(client)
+    response = client.get('/admin/dashboard', headers={'X-Profile': '1'})
+    assert response.status_code == 200
+    phases = [part.split(';')[0] for part in response.headers['Server-Timing'].split(', ')]
+    assert phases == ['db', 'orm', 'template', 'python']
+    [name] = folded(app)
+    assert name.endswith('-admin_dashboard.folded')
+
+
+def test_header_ignored_for_residents(app, client):
+    sample_data.login(client, 'john', 'john123')
+    response = client.get('/resident/dashboard', headers={'X-Profile': '1'})
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+    assert folded(app) == []
+
+
+def test_sample_rate_profiles_anonymous_requests(app, client):
+    app.config['PROFILE_SAMPLE_RATE'] = 1.0
+    response = client.get('/login')
+    assert 'Server-Timing' in response.headers
+    assert len(folded(app)) == 1
+
+
+def test_streamed_page_profiled_after_body_is_sent(app, client):
+    sample_data.login(client)
+    response = client.get('/admin/billing', headers={'X-Profile': '1'})
+    assert response.is_streamed
+    assert b'</html>' in response.data
+    [name] = folded(app)
+    assert name.endswith('-admin_billing.folded')
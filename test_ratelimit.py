@@ -0,0 +1,76 @@
+# test_ratelimit.py
+import pytest
+
+import ratelimit
+from ratelimit import MemoryStore, SqliteStore
+
+
+@pytest.fixture
+def limited(app):
+    app.config['RATELIMIT_ENABLED'] = True
+    app.config['RATELIMIT_RULES'] = {'login': {'ip': (4, 60), 'username': (2, 60)}}
+    return app
+
+
+def attempt(client, username, password='wrong'):
+    return client.post('/login', data={'username': username, 'password': password})
+
+
+def test_login_throttled_per_username(limited, client):
+    assert [attempt(client, 'admin').status_code for _ in range(2)] == [302, 302]
+    response = attempt(client, 'Admin ')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '30'
+    assert attempt(client, 'john').status_code == 302
+    assert limited.extensions['ratelimit'].stats()['login'] == {'allowed': 3, 'limited_username': 1}
+
+
+def test_login_throttled_per_ip(limited, client):
+    assert [attempt(client, f'user{i}').status_code for i in range(4)] == [302] * 4
+    assert attempt(client, 'user9').status_code == 429
+    assert client.get('/login').status_code == 200
+    other = limited.test_client()
+    assert other.post('/login', data={'username': 'user9'},
+                      environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 302
+
+
+def test_disabled_by_config(limited, client):
+    limited.config['RATELIMIT_ENABLED'] = False
+    assert {attempt(client, 'admin').status_code for _ in range(10)} == {302}
+
+
+def test_memory_bucket_refills_and_compacts(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ratelimit.time, 'monotonic', lambda: clock[0])
+    store = MemoryStore(max_keys=1)
+    assert store.consume('a', rate=1.0, capacity=2) == (True, 1.0)
+    assert store.consume('a', rate=1.0, capacity=2) == (True, 0.0)
+    assert store.consume('a', rate=1.0, capacity=2)[0] is False
+    clock[0] += 1.5
+    assert store.consume('a', rate=1.0, capacity=2) == (True, 0.5)
+
+    clock[0] += 10
+    store.consume('b', rate=1.0, capacity=2)
+    assert list(store._full_at) == ['b']
+
+
+def test_memory_store_evicts_in_bulk_when_every_key_is_active(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, 'monotonic', lambda: 1000.0)
+    store = MemoryStore(max_keys=10)
+    for n in range(11):
+        store.consume(f'k{n}', rate=1.0, capacity=n + 1, cost=n + 1)
+
+    # The two buckets closest to full go, leaving room for the next inserts
+    assert sorted(store._full_at) == sorted(f'k{n}' for n in range(2, 11))
+    store.consume('new', rate=1.0, capacity=1)
+    assert len(store._full_at) == 10
+
+
+def test_sqlite_buckets_shared_between_stores(tmp_path):
+    path = str(tmp_path / 'ratelimit.db')
+    first, second = SqliteStore(path), SqliteStore(path)
+    assert first.consume('k', rate=0.001, capacity=2)[0]
+    assert second.consume('k', rate=0.001, capacity=2)[0]
+    assert first.consume('k', rate=0.001, capacity=2)[0] is False
+    assert isinstance(ratelimit.make_store('sqlite:///' + path), SqliteStore)
+    assert isinstance(ratelimit.make_store('memory'), MemoryStore)
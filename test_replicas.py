@@ -0,0 +1,43 @@
+# test_replicas.py
+import pytest
+
+import sample_data
+from main import replica_sync
+from replicas import STICKY_KEY
+
+
+@pytest.fixture
+def app_settings(tmp_path):
+    return {'SQLALCHEMY_READ_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'replica.db')}
+
+
+@pytest.fixture
+def admin(app, client):
+    app.test_cli_runner().invoke(replica_sync)
+    sample_data.login(client)
+    client.post('/admin/notices/add', data={'title': 'Water cut on Friday', 'content': 'Tank cleaning'})
+    yield client
+    app.extensions['read_engine'].dispose()
+
+
+def expire_stickiness(client):
+    with client.session_transaction() as session:
+        session[STICKY_KEY] = 0
+
+
+def test_reads_own_writes_after_posting(admin):
+    assert b'Water cut on Friday' in admin.get('/admin/notices').data
+
+
+def test_read_only_views_use_replica_once_stickiness_expires(app, admin):
+    expire_stickiness(admin)
+    assert b'Water cut on Friday' not in admin.get('/admin/notices').data
+
+    app.test_cli_runner().invoke(replica_sync)
+    assert b'Water cut on Friday' in admin.get('/admin/notices').data
+
+
+def test_sticky_window_follows_config(app, admin):
+    app.config['READ_STICKY_SECONDS'] = 0
+    admin.post('/admin/notices/add', data={'title': 'Lift maintenance', 'content': 'Block B'})
+    assert b'Lift maintenance' not in admin.get('/admin/notices').data
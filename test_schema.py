@@ -0,0 +1,197 @@
+# test_schema.py
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from main import create_app, create_db
+from extensions import db
+from models import User, Member, MaintenanceBill, Complaint
+from tenancy import society_context
+
+# Schema and a little data as the single-society version of the app created them
+BASELINE = """
+CREATE TABLE user (
+    id INTEGER NOT NULL, 
+    username VARCHAR(50) NOT NULL, 
+    password VARCHAR(100) NOT NULL, 
+    role VARCHAR(20) NOT NULL, 
+    email VARCHAR(100), 
+    PRIMARY KEY (id), 
+    UNIQUE (username), 
+    UNIQUE (email)
+);
+CREATE TABLE member (
+    id INTEGER NOT NULL, 
+    name VARCHAR(100) NOT NULL, 
+    flat_no VARCHAR(10) NOT NULL, 
+    contact VARCHAR(15), 
+    email VARCHAR(100), 
+    member_type VARCHAR(20), 
+    join_date DATETIME, 
+    PRIMARY KEY (id), 
+    UNIQUE (email)
+);
+CREATE TABLE maintenance_setting (
+    id INTEGER NOT NULL, 
+    setting_key VARCHAR(50), 
+    setting_value FLOAT, 
+    description VARCHAR(200), 
+    PRIMARY KEY (id), 
+    UNIQUE (setting_key)
+);
+CREATE TABLE complaint (
+    id INTEGER NOT NULL, 
+    description TEXT NOT NULL, 
+    member_id INTEGER NOT NULL, 
+    date_requested DATETIME, 
+    status VARCHAR(20), 
+    category VARCHAR(50), 
+    priority VARCHAR(20), 
+    assigned_to VARCHAR(100), 
+    resolved_date DATETIME, 
+    remarks TEXT, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(member_id) REFERENCES member (id)
+);
+CREATE TABLE maintenance_bill (
+    id INTEGER NOT NULL, 
+    member_id INTEGER NOT NULL, 
+    bill_number VARCHAR(50) NOT NULL, 
+    month INTEGER NOT NULL, 
+    year INTEGER NOT NULL, 
+    maintenance_amount FLOAT NOT NULL, 
+    sinking_fund FLOAT NOT NULL, 
+    parking_fee FLOAT NOT NULL, 
+    water_charges FLOAT NOT NULL, 
+    electricity_charges FLOAT NOT NULL, 
+    garbage_fee FLOAT NOT NULL, 
+    late_fee FLOAT NOT NULL, 
+    discount FLOAT NOT NULL, 
+    subtotal FLOAT NOT NULL, 
+    total_amount FLOAT NOT NULL, 
+    due_date DATE NOT NULL, 
+    paid_date DATE, 
+    status VARCHAR(20) NOT NULL, 
+    payment_method VARCHAR(50), 
+    transaction_id VARCHAR(100), 
+    remarks TEXT, 
+    created_at DATETIME, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(member_id) REFERENCES member (id), 
+    UNIQUE (bill_number)
+);
+CREATE TABLE notice (
+    id INTEGER NOT NULL, 
+    title VARCHAR(200) NOT NULL, 
+    content TEXT NOT NULL, 
+    date_posted DATETIME, 
+    posted_by INTEGER, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(posted_by) REFERENCES user (id)
+);
+CREATE TABLE payment (
+    id INTEGER NOT NULL, 
+    bill_id INTEGER, 
+    amount FLOAT, 
+    payment_date DATETIME, 
+    payment_method VARCHAR(50), 
+    transaction_id VARCHAR(100), 
+    remarks TEXT, 
+    PRIMARY KEY (id), 
+    FOREIGN KEY(bill_id) REFERENCES maintenance_bill (id)
+);
+INSERT INTO user VALUES (1, 'admin', 'x', 'admin', 'admin@society.com');
+INSERT INTO member VALUES (1, 'John Doe', '101', NULL, 'john@example.com', 'Owner', '2025-01-01 00:00:00');
+INSERT INTO complaint (id, description, member_id, status) VALUES (1, 'Leak', 1, 'Pending');
+INSERT INTO maintenance_bill VALUES (1, 1, 'BILL/1', 1, 2025, 1800, 0, 0, 0, 0, 0, 0, 0, 1800, 1800,
+                                     '2025-02-10', NULL, 'Unpaid', NULL, NULL, NULL, NULL);
+"""
+
+
+@pytest.fixture
+def upgraded(tmp_path):
+    path = tmp_path / 'old.db'
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE)
+    conn.close()
+
+    app = create_app('testing', SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', SOCIETIES=['alpha'])
+    result = app.test_cli_runner().invoke(create_db)
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+    app.extensions['audit'].close()
+
+
+def test_upgrade_makes_old_unique_columns_per_society(upgraded):
+    with society_context('alpha'):
+        db.session.add(User(username='admin', password='x', role='admin', email='admin@society.com'))
+        db.session.add(Member(id=2, name='Alpha John', flat_no='101', email='john@example.com'))
+        db.session.add(MaintenanceBill(member_id=2, bill_number='BILL/1', month=1, year=2025,
+                                       due_date=date(2025, 2, 10)))
+        db.session.commit()
+
+    assert User.query.execution_options(all_societies=True).filter_by(username='admin').count() == 2
+    assert User.query.filter_by(username='admin').one().society_id == 'default'
+    assert MaintenanceBill.query.one().bill_number == 'BILL/1'
+    # Rows survive the rebuild, and references to the rebuilt tables still resolve
+    assert Complaint.query.one().member.name == 'John Doe'
+    assert Member.query.one().join_date == datetime(2025, 1, 1)
+
+
+def test_upgrade_keeps_uniqueness_within_a_society(upgraded):
+    db.session.add(User(username='admin', password='y', role='admin', email='other@society.com'))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+
+
+def test_upgrade_keeps_uniqueness_the_models_still_declare(upgraded):
+    conn = db.engine.raw_connection()
+    try:
+        conn.execute("INSERT INTO maintenance_setting (setting_key) VALUES ('rate')")
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO maintenance_setting (setting_key) VALUES ('rate')")
+    finally:
+        conn.close()
+
+
+def test_upgrade_is_idempotent(upgraded):
+    from schema import upgrade_schema
+
+    assert upgrade_schema(db.engine, db.metadata) == []
+
+
+def test_upgrade_backfills_the_configured_default_society(tmp_path):
+    path = tmp_path / 'old.db'
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE)
+    conn.close()
+
+    app = create_app('testing', SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}', DEFAULT_SOCIETY='main')
+    result = app.test_cli_runner().invoke(create_db)
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert User.query.one().username == 'admin'
+        assert Complaint.query.one().society_id == 'main'
+        db.session.remove()
+        db.engine.dispose()
+    app.extensions['audit'].close()
+
+
+def test_engine_pool_eviction_leaves_engines_in_use_alone(tmp_path):
+    from sqlalchemy import text
+    from tenancy import SocietyEnginePool
+
+    pool = SocietyEnginePool(str(tmp_path), db.metadata, max_size=1)
+    alpha = pool.get('alpha')
+    with alpha.connect() as conn:
+        assert pool.get('beta') is not alpha
+        assert conn.execute(text('SELECT count(*) FROM user')).scalar() == 0
+    assert alpha.pool.checkedin() > 0
+    assert pool.get('alpha') is not alpha
+    pool.dispose()
+    alpha.dispose()
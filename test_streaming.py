@@ -0,0 +1,34 @@
+# test_streaming.py
+import main
+import sample_data
+from extensions import db
+from models import MaintenanceBill, Member
+
+
+def test_flash_shown_once_on_streamed_page(app, client):
+    with app.app_context():
+        bill_id = MaintenanceBill.query.first().id
+    sample_data.login(client)
+    page = client.get(f'/admin/billing/delete/{bill_id}', follow_redirects=True)
+    assert page.request.path == '/admin/billing'
+    assert b'Bill deleted!' in page.data
+    assert b'Bill deleted!' not in client.get('/admin/billing').data
+
+
+def test_long_listing_streamed_in_chunks(app, client):
+    with app.app_context():
+        MaintenanceBill.query.delete()
+        db.session.commit()
+        member_count = Member.query.count()
+        sample_data.add_bills(1500, member_count)
+    sample_data.login(client)
+
+    response = client.get('/admin/billing', buffered=False)
+    assert response.is_streamed
+    chunks = list(response.response)
+    response.close()
+    assert len(chunks) > 2
+    assert all(len(chunk) >= main.STREAM_CHUNK_SIZE for chunk in chunks[:-1])
+    body = b''.join(c if isinstance(c, bytes) else c.encode() for c in chunks)
+    assert b'BENCH/0<' in body and b'BENCH/1499<' in body
+    assert body.rstrip().endswith(b'</html>')